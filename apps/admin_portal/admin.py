@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import AuditLog
+from .models import AuditLog, GenerationJob
 
 
 @admin.register(AuditLog)
@@ -9,4 +9,11 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_filter = ("event_type",)
     search_fields = ("actor__login_id", "target_user__login_id", "target_question__id")
 
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "option", "status", "attempts", "locked_by", "available_at", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("id", "option__id", "option__question__id", "locked_by")
+
 # Register your models here.
@@ -17,6 +17,9 @@ class QuestionWizardForm(forms.Form):
     generation_profile_id = forms.IntegerField(required=False, min_value=1)
     difficulty = forms.ChoiceField(choices=Question.Difficulty.choices)
     publish_now = forms.BooleanField(required=False, initial=True)
+    bypass_cache = forms.BooleanField(
+        required=False, help_text="同一条件の生成結果キャッシュを使わずにOpenRouterを呼び出す"
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -0,0 +1,63 @@
+import logging
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.admin_portal.services.generation_jobs import claim_next_job, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Claim and run queued option generation jobs. Safe to run in several processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as no job is claimable instead of polling.",
+        )
+        parser.add_argument("--interval", type=float, default=2.0)
+        parser.add_argument("--max-jobs", type=int, default=None)
+        parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        previous_handlers = {
+            signum: signal.signal(signum, self._request_stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        processed = 0
+        try:
+            while not self.stopping:
+                close_old_connections()
+                job = claim_next_job(worker_id=options["worker_id"])
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+                    continue
+                # A stop request lets the claimed job finish; it is never left half-written.
+                try:
+                    job = run_job(job)
+                except Exception:
+                    # One buggy job must not take the worker down. Its lease still
+                    # expires, which hands it back for retry until max_attempts.
+                    logger.exception("Generation job %s crashed", job.id)
+                    self.stderr.write(f"job={job.id} option={job.option_id} status=crashed")
+                else:
+                    self.stdout.write(f"job={job.id} option={job.option_id} status={job.status}")
+                processed += 1
+                if options["max_jobs"] and processed >= options["max_jobs"]:
+                    break
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} generation jobs."))
+
+    def _request_stop(self, signum, frame):
+        self.stopping = True
@@ -34,4 +34,45 @@ class AuditLog(models.Model):
     def __str__(self):
         return f"{self.event_type} by {self.actor_id}"
 
-# Create your models here.
+
+class GenerationJob(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    option = models.ForeignKey(
+        "content.Option",
+        on_delete=models.CASCADE,
+        related_name="generation_jobs",
+    )
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    bypass_cache = models.BooleanField(default=False)
+    publish_when_ready = models.BooleanField(default=False)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="generation_jobs",
+    )
+    available_at = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="generation_job_queue_idx"),
+            models.Index(fields=["status", "locked_until"], name="generation_job_lease_idx"),
+        ]
+
+    def __str__(self):
+        return f"GenerationJob#{self.pk} ({self.status})"
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.content.models import Option, Question
+from apps.quiz.models import EligibleQuestion, SessionQuestion
+
+
+DASHBOARD_METRICS_KEY = "admin_portal:dashboard_metrics"
+CONSUMPTION_WINDOW = timedelta(hours=24)
+
+
+def compute_dashboard_metrics(now=None):
+    now = now or timezone.now()
+    counts = Question.objects.aggregate(
+        published=Count("id", filter=Q(status=Question.Status.PUBLISHED)),
+        draft=Count("id", filter=Q(status=Question.Status.DRAFT)),
+    )
+    stock = {
+        (row["difficulty"], row["choice_count"]): {
+            "difficulty": row["difficulty"],
+            "choice_count": row["choice_count"],
+            "count": row["count"],
+            "consumed_24h": 0,
+        }
+        for row in EligibleQuestion.objects.values("difficulty", "choice_count")
+        .annotate(count=Count("question_id"))
+        .order_by("difficulty", "choice_count")
+    }
+    consumed = (
+        SessionQuestion.objects.filter(created_at__gte=now - CONSUMPTION_WINDOW)
+        .values("question__difficulty", "question__choice_count")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in consumed:
+        key = (row["question__difficulty"], row["question__choice_count"])
+        bucket = stock.setdefault(
+            key,
+            {"difficulty": key[0], "choice_count": key[1], "count": 0, "consumed_24h": 0},
+        )
+        bucket["consumed_24h"] = row["count"]
+    return {
+        "published_count": counts["published"],
+        "draft_count": counts["draft"],
+        "error_option_count": Option.objects.filter(
+            generation_status=Option.GenerationStatus.ERROR
+        ).count(),
+        "stock": [stock[key] for key in sorted(stock)],
+        "computed_at": now,
+    }
+
+
+def dashboard_metrics():
+    metrics = cache.get(DASHBOARD_METRICS_KEY)
+    if metrics is None:
+        metrics = compute_dashboard_metrics()
+        cache.set(DASHBOARD_METRICS_KEY, metrics, settings.DASHBOARD_METRICS_TTL_SECONDS)
+    return metrics
+
+
+def invalidate_dashboard_metrics():
+    # After commit, so a concurrent dashboard load cannot re-cache the pre-change numbers.
+    transaction.on_commit(lambda: cache.delete(DASHBOARD_METRICS_KEY))
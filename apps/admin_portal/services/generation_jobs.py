@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.admin_portal.models import GenerationJob
+from apps.admin_portal.services.question_wizard_service import (
+    publish_question,
+    retry_option_generation,
+)
+from apps.content.models import Option
+from apps.content.services.openrouter_client import OpenRouterError
+
+CLAIM_CANDIDATES = 10
+RETRY_DELAY_SECONDS = 30
+
+
+def _claimable(now):
+    # Queued jobs that are due, plus running jobs whose worker lost its lease.
+    return GenerationJob.objects.filter(
+        Q(status=GenerationJob.Status.QUEUED, available_at__lte=now)
+        | Q(status=GenerationJob.Status.RUNNING, locked_until__lt=now)
+    )
+
+
+def _fail_abandoned_jobs(now):
+    abandoned = GenerationJob.objects.filter(
+        status=GenerationJob.Status.RUNNING,
+        locked_until__lt=now,
+        attempts__gte=F("max_attempts"),
+    )
+    option_ids = list(abandoned.values_list("option_id", flat=True))
+    if not option_ids:
+        return 0
+    failed = abandoned.update(
+        status=GenerationJob.Status.FAILED,
+        last_error="visibility timeout exceeded",
+        finished_at=now,
+        updated_at=now,
+    )
+    Option.objects.filter(
+        id__in=option_ids, generation_status=Option.GenerationStatus.PENDING
+    ).update(
+        generation_status=Option.GenerationStatus.ERROR,
+        error_message="worker:generation job timed out",
+        updated_at=now,
+    )
+    return failed
+
+
+def claim_next_job(*, worker_id, now=None):
+    now = now or timezone.now()
+    _fail_abandoned_jobs(now)
+    lease = {
+        "status": GenerationJob.Status.RUNNING,
+        "locked_by": worker_id,
+        "locked_until": now + timedelta(seconds=settings.GENERATION_JOB_VISIBILITY_SECONDS),
+        "attempts": F("attempts") + 1,
+        "started_at": now,
+        "updated_at": now,
+    }
+    with transaction.atomic():
+        candidates = _claimable(now).order_by("available_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        candidate_ids = list(candidates.values_list("id", flat=True)[:CLAIM_CANDIDATES])
+        for job_id in candidate_ids:
+            # The conditional update is the claim itself; a worker that lost the race updates 0 rows.
+            if _claimable(now).filter(id=job_id).update(**lease):
+                return GenerationJob.objects.select_related(
+                    "option", "option__question", "option__llm_model"
+                ).get(id=job_id)
+    return None
+
+
+def _publish_if_ready(job):
+    question = job.option.question
+    siblings = GenerationJob.objects.filter(
+        option__question=question, publish_when_ready=True
+    ).exclude(status__in=[GenerationJob.Status.DONE, GenerationJob.Status.FAILED])
+    if siblings.exists() or question.status != question.Status.DRAFT:
+        return False
+    return publish_question(question, actor=job.requested_by)
+
+
+def run_job(job):
+    now = timezone.now()
+    owned = GenerationJob.objects.filter(
+        id=job.id, status=GenerationJob.Status.RUNNING, locked_by=job.locked_by
+    )
+    try:
+        option = retry_option_generation(job.option, bypass_cache=job.bypass_cache)
+        error = "" if option.generation_status == Option.GenerationStatus.OK else option.error_message
+    except (OpenRouterError, DatabaseError) as exc:
+        # Anything else is a bug: it propagates and the lease expiry hands the job back.
+        error = f"worker:{type(exc).__name__}:{str(exc)[:220]}"
+
+    finished = timezone.now()
+    if not error:
+        owned.update(
+            status=GenerationJob.Status.DONE, last_error="", finished_at=finished, updated_at=finished
+        )
+    elif job.attempts < job.max_attempts:
+        delay = RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+        owned.update(
+            status=GenerationJob.Status.QUEUED,
+            last_error=error,
+            available_at=now + timedelta(seconds=delay),
+            locked_by="",
+            locked_until=None,
+            updated_at=finished,
+        )
+    else:
+        owned.update(
+            status=GenerationJob.Status.FAILED,
+            last_error=error,
+            finished_at=finished,
+            updated_at=finished,
+        )
+    job.refresh_from_db()
+    if job.publish_when_ready and job.requested_by_id and job.status in (
+        GenerationJob.Status.DONE,
+        GenerationJob.Status.FAILED,
+    ):
+        _publish_if_ready(job)
+    return job
@@ -1,5 +1,139 @@
-from apps.content.models import LlmModel, Option
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.admin_portal.models import AuditLog, GenerationJob
+from apps.admin_portal.services.dashboard_metrics import invalidate_dashboard_metrics
+from apps.content.models import LlmModel, Option, Question
+from apps.content.services import circuit_breaker
+from apps.content.services.generation_cache import (
+    generation_cache_key,
+    get_cached_generation,
+    store_generation,
+)
 from apps.content.services.openrouter_client import OpenRouterError, generate
+from apps.quiz.services.answer_key import invalidate_answer_key, invalidate_answer_keys
+from apps.quiz.services.question_pool import sync_question_pool
+
+logger = logging.getLogger(__name__)
+
+
+def question_is_publishable(question):
+    # .all() reuses a prefetch, so bulk_publish_questions checks a whole batch in one query.
+    options = list(question.options.all())
+    if len(options) != question.choice_count:
+        return False
+    human_options = [option for option in options if option.author_type == Option.AuthorType.HUMAN]
+    ai_options = [option for option in options if option.author_type == Option.AuthorType.AI]
+    if len(human_options) != 1:
+        return False
+    if len(ai_options) != question.choice_count - 1:
+        return False
+    if any(option.generation_status != Option.GenerationStatus.OK for option in options):
+        return False
+    if question.choice_count == 4 and len({option.llm_model_id for option in ai_options}) != 3:
+        return False
+    return True
+
+
+def publish_question(question, *, actor):
+    with transaction.atomic():
+        if question.status == Question.Status.PUBLISHED:
+            return True
+        if not question_is_publishable(question):
+            return False
+        # Conditional update: a double submit or a second worker finds nothing left to publish
+        # and neither re-syncs the pool nor writes a second audit entry.
+        published = (
+            Question.objects.filter(id=question.id)
+            .exclude(status=Question.Status.PUBLISHED)
+            .update(
+                status=Question.Status.PUBLISHED,
+                published_at=Coalesce(F("published_at"), F("created_at")),
+                updated_at=timezone.now(),
+            )
+        )
+        question.refresh_from_db(fields=["status", "published_at", "updated_at"])
+        if not published:
+            return True
+        sync_question_pool([question.id])
+        AuditLog.objects.create(
+            actor=actor,
+            event_type=AuditLog.EventType.QUESTION_PUBLISH,
+            target_question=question,
+        )
+        invalidate_dashboard_metrics()
+    return True
+
+
+def _lock_question_ids(question_ids, *, exclude_status):
+    # Locking the rows first means only the questions this call actually moves get an audit row.
+    return list(
+        Question.objects.select_for_update()
+        .filter(id__in=question_ids)
+        .exclude(status=exclude_status)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+def _bulk_audit(*, actor, event_type, question_ids):
+    AuditLog.objects.bulk_create(
+        [
+            AuditLog(actor=actor, event_type=event_type, target_question_id=question_id)
+            for question_id in question_ids
+        ]
+    )
+
+
+def bulk_publish_questions(question_ids, *, actor):
+    with transaction.atomic():
+        questions = list(
+            Question.objects.filter(id__in=question_ids)
+            .exclude(status=Question.Status.PUBLISHED)
+            .only("id", "choice_count")
+            .prefetch_related(
+                Prefetch(
+                    "options",
+                    queryset=Option.objects.only(
+                        "id", "question_id", "author_type", "generation_status", "llm_model_id"
+                    ),
+                )
+            )
+        )
+        publishable = [question.id for question in questions if question_is_publishable(question)]
+        rejected = sorted({question.id for question in questions} - set(publishable))
+        published = _lock_question_ids(publishable, exclude_status=Question.Status.PUBLISHED)
+        Question.objects.filter(id__in=published).update(
+            status=Question.Status.PUBLISHED,
+            published_at=Coalesce(F("published_at"), F("created_at")),
+            updated_at=timezone.now(),
+        )
+        sync_question_pool(published)
+        _bulk_audit(
+            actor=actor, event_type=AuditLog.EventType.QUESTION_PUBLISH, question_ids=published
+        )
+        invalidate_dashboard_metrics()
+    return published, rejected
+
+
+def bulk_archive_questions(question_ids, *, actor):
+    with transaction.atomic():
+        archived = _lock_question_ids(question_ids, exclude_status=Question.Status.ARCHIVED)
+        Question.objects.filter(id__in=archived).update(
+            status=Question.Status.ARCHIVED, updated_at=timezone.now()
+        )
+        sync_question_pool(archived)
+        _bulk_audit(
+            actor=actor, event_type=AuditLog.EventType.QUESTION_ARCHIVE, question_ids=archived
+        )
+        invalidate_dashboard_metrics()
+    return archived
 
 
 def _build_system_prompt(base_prompt):
@@ -25,7 +159,7 @@ def ensure_human_option(question):
     return human_option
 
 
-def _run_generation_for_model(
+def _prepare_option(
     *,
     question,
     llm_model,
@@ -59,26 +193,84 @@ def _run_generation_for_model(
             "updated_at",
         ]
     )
+    return option
+
+
+def _call_model(*, question, llm_model, option):
+    # Runs in worker threads: network only, no ORM access.
     try:
-        result = generate(
+        return generate(
             api_model_name=llm_model.api_model_name,
             user_prompt=question.scenario.user_message_text,
-            system_prompt=system_prompt,
-            temperature=temperature,
-            seed=seed,
-            max_tokens=max_tokens,
+            system_prompt=option.system_prompt,
+            temperature=option.temperature,
+            seed=option.seed,
+            max_tokens=option.max_tokens,
+            fallback_model_names=llm_model.fallback_model_names,
         )
     except OpenRouterError as exc:
+        return exc
+
+
+def _cache_key_for(question, llm_model, option):
+    return generation_cache_key(
+        api_model_name=llm_model.api_model_name,
+        system_prompt=option.system_prompt,
+        user_prompt=question.scenario.user_message_text,
+        temperature=option.temperature,
+        seed=option.seed,
+        max_tokens=option.max_tokens,
+    )
+
+
+def _circuit_error(llm_model):
+    try:
+        circuit_breaker.before_call(llm_model)
+    except circuit_breaker.CircuitOpenError as exc:
+        return exc
+    return None
+
+
+def _served_model(option, outcome):
+    # A fallback may have answered; its circuit and cache entry are its own, not the primary's.
+    primary = option.llm_model
+    served = None
+    if not isinstance(outcome, OpenRouterError):
+        served = (outcome.response_payload or {}).get("served_model")
+    if not served or served == primary.api_model_name:
+        return primary
+    # LlmModel.clean() keeps unregistered fallbacks within the primary's provider.
+    return LlmModel.objects.filter(api_model_name=served).first() or LlmModel(
+        provider=primary.provider, api_model_name=served
+    )
+
+
+def _finish_generation(option, outcome, *, cache_key):
+    served_model = _served_model(option, outcome)
+    with transaction.atomic():
+        circuit_breaker.record_outcome(served_model, outcome)
+        if not isinstance(outcome, OpenRouterError):
+            if served_model is not option.llm_model:
+                cache_key = _cache_key_for(option.question, served_model, option)
+            store_generation(
+                cache_key, api_model_name=served_model.api_model_name, result=outcome
+            )
+        return _persist_generation(option, outcome)
+
+
+def _persist_generation(option, outcome):
+    if isinstance(outcome, OpenRouterError):
         option.generation_status = Option.GenerationStatus.ERROR
         option.error_message = (
-            f"{exc.status_code or 'network'}:{str(exc)[:220]}:{(exc.response_text or '')[:220]}"
+            f"{outcome.status_code or 'network'}:{str(outcome)[:220]}:{(outcome.response_text or '')[:220]}"
         )
         option.save(update_fields=["generation_status", "error_message", "updated_at"])
+        invalidate_dashboard_metrics()
         return option
 
-    option.content_text = result.content_text
-    option.request_payload_json = result.request_payload
-    option.response_payload_json = result.response_payload
+    option.content_text = outcome.content_text
+    option.request_payload_json = outcome.request_payload
+    option.response_payload_json = outcome.response_payload
     option.generation_status = Option.GenerationStatus.OK
     option.error_message = ""
     option.save(
@@ -91,9 +283,70 @@ def _run_generation_for_model(
             "updated_at",
         ]
     )
+    invalidate_dashboard_metrics()
     return option
 
 
+def _run_generation_for_model(
+    *,
+    question,
+    llm_model,
+    system_prompt,
+    temperature=None,
+    seed=None,
+    max_tokens=None,
+    bypass_cache=False,
+):
+    option = _prepare_option(
+        question=question,
+        llm_model=llm_model,
+        system_prompt=system_prompt,
+        temperature=temperature,
+        seed=seed,
+        max_tokens=max_tokens,
+    )
+    _generate_prepared([(question, llm_model, option)], bypass_cache=bypass_cache)
+    return option
+
+
+def _generate_prepared(prepared, *, bypass_cache=False):
+    pending = []
+    for question, llm_model, option in prepared:
+        cache_key = _cache_key_for(question, llm_model, option)
+        cached = None if bypass_cache else get_cached_generation(cache_key)
+        if cached is not None:
+            _persist_generation(option, cached)
+            continue
+        blocked = _circuit_error(llm_model)
+        if blocked is not None:
+            _persist_generation(option, blocked)
+            continue
+        pending.append((question, llm_model, option, cache_key))
+
+    if pending:
+        # Only the HTTP calls fan out; every option is saved back on this
+        # thread as its call finishes, so each one still lands OK or ERROR alone.
+        max_workers = max(min(settings.OPENROUTER_MAX_CONCURRENCY, len(pending)), 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    _call_model, question=question, llm_model=llm_model, option=option
+                ): (option, cache_key)
+                for question, llm_model, option, cache_key in pending
+            }
+            for future in as_completed(futures):
+                option, cache_key = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as exc:
+                    # A worker bug must not strand its option in PENDING.
+                    logger.exception("Generation worker failed for option %s", option.id)
+                    error = OpenRouterError(f"{type(exc).__name__}: {exc}")
+                    _persist_generation(option, error)
+                    continue
+                _finish_generation(option, outcome, cache_key=cache_key)
+
+
 def generate_and_persist_options(
     *,
     question,
@@ -102,17 +355,113 @@ def generate_and_persist_options(
     temperature=None,
     seed=None,
     max_tokens=None,
+    bypass_cache=False,
 ):
-    ensure_human_option(question)
     models = list(LlmModel.objects.filter(id__in=selected_model_ids, is_active=True))
     model_by_id = {model.id: model for model in models}
-    generated_options = []
     final_system_prompt = _build_system_prompt(system_prompt)
+    prepared = []
+    with transaction.atomic():
+        ensure_human_option(question)
+        for model_id in selected_model_ids:
+            llm_model = model_by_id.get(int(model_id))
+            if not llm_model:
+                continue
+            prepared.append(
+                (
+                    llm_model,
+                    _prepare_option(
+                        question=question,
+                        llm_model=llm_model,
+                        system_prompt=final_system_prompt,
+                        temperature=temperature,
+                        seed=seed,
+                        max_tokens=max_tokens,
+                    ),
+                )
+            )
+
+    # Everything below runs outside any transaction: cache hits and each finished
+    # call are saved in their own short transaction.
+    _generate_prepared(
+        [(question, llm_model, option) for llm_model, option in prepared],
+        bypass_cache=bypass_cache,
+    )
+    invalidate_answer_key(question.id)
+    sync_question_pool([question.id])
+    return [option for _, option in prepared]
+
+
+def retry_option_generation(option, *, bypass_cache=False):
+    if option.author_type != Option.AuthorType.AI:
+        return option
+    retried = _run_generation_for_model(
+        question=option.question,
+        llm_model=option.llm_model,
+        system_prompt=option.system_prompt or "",
+        temperature=option.temperature,
+        seed=option.seed,
+        max_tokens=option.max_tokens,
+        bypass_cache=bypass_cache,
+    )
+    invalidate_answer_key(option.question_id)
+    sync_question_pool([option.question_id])
+    return retried
+
+
+def _failed_options(question_ids):
+    return Option.objects.filter(
+        question_id__in=question_ids,
+        author_type=Option.AuthorType.AI,
+        generation_status=Option.GenerationStatus.ERROR,
+    ).order_by("id")
+
+
+def retry_failed_options(question_ids, *, bypass_cache=False):
+    options = list(_failed_options(question_ids).select_related("question__scenario", "llm_model"))
+    if not options:
+        return []
+    Option.objects.filter(id__in=[option.id for option in options]).update(
+        generation_status=Option.GenerationStatus.PENDING,
+        error_message="",
+        updated_at=timezone.now(),
+    )
+    # Same bounded pool as the wizard: OPENROUTER_MAX_CONCURRENCY calls across the whole batch.
+    _generate_prepared(
+        [(option.question, option.llm_model, option) for option in options],
+        bypass_cache=bypass_cache,
+    )
+    retried_question_ids = sorted({option.question_id for option in options})
+    invalidate_answer_keys(retried_question_ids)
+    sync_question_pool(retried_question_ids)
+    return options
+
+
+def enqueue_generation_jobs(
+    *,
+    question,
+    selected_model_ids,
+    system_prompt="",
+    temperature=None,
+    seed=None,
+    max_tokens=None,
+    bypass_cache=False,
+    publish_when_ready=False,
+    requested_by=None,
+):
+    ensure_human_option(question)
+    model_by_id = {
+        model.id: model
+        for model in LlmModel.objects.filter(id__in=selected_model_ids, is_active=True)
+    }
+    final_system_prompt = _build_system_prompt(system_prompt)
+    now = timezone.now()
+    jobs = []
     for model_id in selected_model_ids:
         llm_model = model_by_id.get(int(model_id))
         if not llm_model:
             continue
-        generated = _run_generation_for_model(
+        option = _prepare_option(
             question=question,
             llm_model=llm_model,
             system_prompt=final_system_prompt,
@@ -120,18 +469,50 @@ def generate_and_persist_options(
             seed=seed,
             max_tokens=max_tokens,
         )
-        generated_options.append(generated)
-    return generated_options
+        jobs.append(
+            GenerationJob(
+                option=option,
+                bypass_cache=bypass_cache,
+                publish_when_ready=publish_when_ready,
+                requested_by=requested_by,
+                max_attempts=settings.GENERATION_JOB_MAX_ATTEMPTS,
+                available_at=now,
+            )
+        )
+    return GenerationJob.objects.bulk_create(jobs)
 
 
-def retry_option_generation(option):
-    if option.author_type != Option.AuthorType.AI:
-        return option
-    return _run_generation_for_model(
-        question=option.question,
-        llm_model=option.llm_model,
-        system_prompt=option.system_prompt or "",
-        temperature=option.temperature,
-        seed=option.seed,
-        max_tokens=option.max_tokens,
+def enqueue_option_retry(option, *, bypass_cache=False, requested_by=None):
+    Option.objects.filter(id=option.id).update(
+        generation_status=Option.GenerationStatus.PENDING,
+        error_message="",
+        updated_at=timezone.now(),
     )
+    return GenerationJob.objects.create(
+        option=option,
+        bypass_cache=bypass_cache,
+        requested_by=requested_by,
+        max_attempts=settings.GENERATION_JOB_MAX_ATTEMPTS,
+        available_at=timezone.now(),
+    )
+
+
+def enqueue_failed_option_retries(question_ids, *, bypass_cache=False, requested_by=None):
+    with transaction.atomic():
+        option_ids = list(_failed_options(question_ids).values_list("id", flat=True))
+        now = timezone.now()
+        Option.objects.filter(id__in=option_ids).update(
+            generation_status=Option.GenerationStatus.PENDING, error_message="", updated_at=now
+        )
+        return GenerationJob.objects.bulk_create(
+            [
+                GenerationJob(
+                    option_id=option_id,
+                    bypass_cache=bypass_cache,
+                    requested_by=requested_by,
+                    max_attempts=settings.GENERATION_JOB_MAX_ATTEMPTS,
+                    available_at=now,
+                )
+                for option_id in option_ids
+            ]
+        )
@@ -1,37 +1,36 @@
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models import Count, Q
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404, redirect, render
 
 from apps.content.models import GenerationProfile, Genre, Option, Question, Scenario, Tag
+from apps.content.services.circuit_breaker import circuit_overview
+from apps.content.services.generation_cache import generation_cache_stats
+from apps.quiz.services.question_pool import sync_question_pool
+from apps.quiz.services.question_stats import get_question_stats
 
 from .forms import ForcePasswordResetForm, QuestionWizardForm
 from .models import AuditLog
-from .services.question_wizard_service import generate_and_persist_options, retry_option_generation
+from .services.dashboard_metrics import dashboard_metrics, invalidate_dashboard_metrics
+from .services.question_wizard_service import (
+    bulk_archive_questions,
+    bulk_publish_questions,
+    enqueue_failed_option_retries,
+    enqueue_generation_jobs,
+    enqueue_option_retry,
+    generate_and_persist_options,
+    publish_question,
+    retry_failed_options,
+    retry_option_generation,
+)
 
 
 User = get_user_model()
 
 
-def _question_is_publishable(question):
-    options = list(question.options.select_related("llm_model"))
-    if len(options) != question.choice_count:
-        return False
-    human_options = [option for option in options if option.author_type == Option.AuthorType.HUMAN]
-    ai_options = [option for option in options if option.author_type == Option.AuthorType.AI]
-    if len(human_options) != 1:
-        return False
-    if len(ai_options) != question.choice_count - 1:
-        return False
-    if any(option.generation_status != Option.GenerationStatus.OK for option in options):
-        return False
-    if question.choice_count == 4 and len({option.llm_model_id for option in ai_options}) != 3:
-        return False
-    return True
-
-
 def _write_audit(*, actor, event_type, target_user=None, target_question=None, metadata=None):
     AuditLog.objects.create(
         actor=actor,
@@ -44,27 +43,18 @@ def _write_audit(*, actor, event_type, target_user=None, target_question=None, m
 
 @staff_member_required
 def admin_dashboard_view(request):
-    published_count = Question.objects.filter(status=Question.Status.PUBLISHED).count()
-    draft_count = Question.objects.filter(status=Question.Status.DRAFT).count()
-    stock_by_difficulty = (
-        Question.objects.filter(status=Question.Status.PUBLISHED)
-        .values("difficulty", "choice_count")
-        .annotate(count=Count("id"))
-        .order_by("difficulty", "choice_count")
-    )
     return render(
         request,
         "admin_portal/dashboard.html",
         {
-            "published_count": published_count,
-            "draft_count": draft_count,
-            "stock_by_difficulty": stock_by_difficulty,
+            "metrics": dashboard_metrics(),
+            "generation_cache": generation_cache_stats(),
+            "circuits": circuit_overview(),
         },
     )
 
 
 @staff_member_required
-@transaction.atomic
 def question_create_view(request):
     form = QuestionWizardForm(request.POST or None)
     context = {
@@ -74,59 +64,110 @@ def question_create_view(request):
         "profiles": GenerationProfile.objects.order_by("name"),
     }
     if request.method == "POST" and form.is_valid():
-        genre = get_object_or_404(Genre, id=form.cleaned_data["genre_id"], is_active=True)
-        scenario = Scenario.objects.create(
-            user_message_text=form.cleaned_data["user_message_text"],
-            human_reply_text=form.cleaned_data["human_reply_text"],
-            genre=genre,
-            created_by_admin=request.user,
-        )
-        tag_ids_raw = form.cleaned_data.get("tag_ids", "").strip()
-        if tag_ids_raw:
-            tag_ids = [int(value.strip()) for value in tag_ids_raw.split(",") if value.strip().isdigit()]
-            scenario.tags.add(*Tag.objects.filter(id__in=tag_ids, is_active=True))
-
-        profile = None
-        if form.cleaned_data.get("generation_profile_id"):
-            profile = GenerationProfile.objects.filter(
-                id=form.cleaned_data["generation_profile_id"]
-            ).first()
-
-        question = Question.objects.create(
-            scenario=scenario,
-            status=Question.Status.DRAFT,
-            difficulty=form.cleaned_data["difficulty"],
-            choice_count=form.cleaned_data["choice_count"],
-            generation_profile=profile,
-            created_by_admin=request.user,
-        )
-        generate_and_persist_options(
-            question=question,
-            selected_model_ids=form.cleaned_data["selected_model_ids"],
-            system_prompt=form.cleaned_data.get("system_prompt", ""),
-            temperature=form.cleaned_data.get("temperature"),
-            seed=form.cleaned_data.get("seed"),
-            max_tokens=form.cleaned_data.get("max_tokens"),
-        )
-        if form.cleaned_data.get("publish_now") and _question_is_publishable(question):
-            question.status = Question.Status.PUBLISHED
-            question.published_at = question.published_at or question.created_at
-            question.save(update_fields=["status", "published_at", "updated_at"])
-            _write_audit(
-                actor=request.user,
-                event_type=AuditLog.EventType.QUESTION_PUBLISH,
-                target_question=question,
+        # Only the scenario/question rows share a transaction; the LLM calls run outside it.
+        with transaction.atomic():
+            genre = get_object_or_404(Genre, id=form.cleaned_data["genre_id"], is_active=True)
+            scenario = Scenario.objects.create(
+                user_message_text=form.cleaned_data["user_message_text"],
+                human_reply_text=form.cleaned_data["human_reply_text"],
+                genre=genre,
+                created_by_admin=request.user,
+            )
+            tag_ids_raw = form.cleaned_data.get("tag_ids", "").strip()
+            if tag_ids_raw:
+                tag_ids = [int(value.strip()) for value in tag_ids_raw.split(",") if value.strip().isdigit()]
+                scenario.tags.add(*Tag.objects.filter(id__in=tag_ids, is_active=True))
+
+            profile = None
+            if form.cleaned_data.get("generation_profile_id"):
+                profile = GenerationProfile.objects.filter(
+                    id=form.cleaned_data["generation_profile_id"]
+                ).first()
+
+            question = Question.objects.create(
+                scenario=scenario,
+                status=Question.Status.DRAFT,
+                difficulty=form.cleaned_data["difficulty"],
+                choice_count=form.cleaned_data["choice_count"],
+                generation_profile=profile,
+                created_by_admin=request.user,
+            )
+        generation_kwargs = {
+            "question": question,
+            "selected_model_ids": form.cleaned_data["selected_model_ids"],
+            "system_prompt": form.cleaned_data.get("system_prompt", ""),
+            "temperature": form.cleaned_data.get("temperature"),
+            "seed": form.cleaned_data.get("seed"),
+            "max_tokens": form.cleaned_data.get("max_tokens"),
+            "bypass_cache": form.cleaned_data.get("bypass_cache", False),
+        }
+        if settings.GENERATION_ASYNC_JOBS:
+            with transaction.atomic():
+                enqueue_generation_jobs(
+                    **generation_kwargs,
+                    publish_when_ready=form.cleaned_data.get("publish_now", False),
+                    requested_by=request.user,
+                )
+            messages.success(
+                request, f"Question #{question.id} を作成し、生成ジョブを登録しました。"
             )
-        elif form.cleaned_data.get("publish_now"):
+            return redirect("admin-question-list")
+        generate_and_persist_options(**generation_kwargs)
+        if form.cleaned_data.get("publish_now") and not publish_question(
+            question, actor=request.user
+        ):
             messages.warning(request, "公開条件を満たさなかったため下書き保存しました。")
         messages.success(request, f"Question #{question.id} を作成しました。")
         return redirect("admin-question-list")
     return render(request, "admin_portal/question_create.html", context)
 
 
+def _bulk_question_action(request):
+    question_ids = sorted({int(value) for value in request.POST.getlist("question_ids") if value.isdigit()})
+    action = request.POST.get("action")
+    if not question_ids:
+        messages.error(request, "問題が選択されていません。")
+        return redirect("admin-question-list")
+
+    if action == "bulk_publish":
+        published, rejected = bulk_publish_questions(question_ids, actor=request.user)
+        messages.success(request, f"{len(published)} 件を公開しました。")
+        if rejected:
+            rejected_ids = ", ".join(f"#{question_id}" for question_id in rejected)
+            messages.error(request, f"公開条件を満たしていません: {rejected_ids}")
+    elif action == "bulk_archive":
+        archived = bulk_archive_questions(question_ids, actor=request.user)
+        messages.success(request, f"{len(archived)} 件を停止しました。")
+    elif action == "bulk_retry":
+        bypass_cache = request.POST.get("bypass_cache") == "1"
+        if settings.GENERATION_ASYNC_JOBS:
+            jobs = enqueue_failed_option_retries(
+                question_ids, bypass_cache=bypass_cache, requested_by=request.user
+            )
+            messages.info(request, f"{len(jobs)} 件の再試行ジョブを登録しました。")
+        else:
+            options = retry_failed_options(question_ids, bypass_cache=bypass_cache)
+            messages.info(request, f"{len(options)} 件の選択肢の再試行を実行しました。")
+    return redirect("admin-question-list")
+
+
 @staff_member_required
 def question_list_view(request):
-    questions = Question.objects.select_related("scenario", "scenario__genre").prefetch_related("options").order_by("-id")
+    # Only the columns the list renders; scenario and option texts stay in the database.
+    questions = (
+        Question.objects.select_related("scenario__genre")
+        .only("id", "status", "difficulty", "choice_count", "scenario__genre__name")
+        .prefetch_related(
+            Prefetch(
+                "options",
+                queryset=Option.objects.only(
+                    "id", "question_id", "author_type", "generation_status", "error_message"
+                ),
+            )
+        )
+        .order_by("-id")
+    )
+    before = request.GET.get("before", "")
     status = request.GET.get("status")
     difficulty = request.GET.get("difficulty")
     if status:
@@ -134,62 +175,69 @@ def question_list_view(request):
     if difficulty:
         questions = questions.filter(difficulty=difficulty)
 
+    if request.method == "POST" and request.POST.get("action", "").startswith("bulk_"):
+        return _bulk_question_action(request)
+
     if request.method == "POST":
         question = get_object_or_404(Question, id=request.POST.get("question_id"))
         action = request.POST.get("action")
-        if action == "publish":
-            if _question_is_publishable(question):
-                question.status = Question.Status.PUBLISHED
-                question.published_at = question.published_at or question.created_at
-                question.save(update_fields=["status", "published_at", "updated_at"])
+        with transaction.atomic():
+            if action == "publish":
+                if not publish_question(question, actor=request.user):
+                    messages.error(request, "公開条件を満たしていません。")
+            elif action == "archive":
+                question.status = Question.Status.ARCHIVED
+                question.save(update_fields=["status", "updated_at"])
+                sync_question_pool([question.id])
                 _write_audit(
                     actor=request.user,
-                    event_type=AuditLog.EventType.QUESTION_PUBLISH,
+                    event_type=AuditLog.EventType.QUESTION_ARCHIVE,
                     target_question=question,
                 )
-            else:
-                messages.error(request, "公開条件を満たしていません。")
-        elif action == "archive":
-            question.status = Question.Status.ARCHIVED
-            question.save(update_fields=["status", "updated_at"])
-            _write_audit(
-                actor=request.user,
-                event_type=AuditLog.EventType.QUESTION_ARCHIVE,
-                target_question=question,
-            )
-        elif action == "variant":
-            Question.objects.create(
-                scenario=question.scenario,
-                status=Question.Status.DRAFT,
-                difficulty=question.difficulty,
-                choice_count=question.choice_count,
-                generation_profile=question.generation_profile,
-                variant_of_question=question,
-                created_by_admin=request.user,
-            )
+            elif action == "variant":
+                Question.objects.create(
+                    scenario=question.scenario,
+                    status=Question.Status.DRAFT,
+                    difficulty=question.difficulty,
+                    choice_count=question.choice_count,
+                    generation_profile=question.generation_profile,
+                    variant_of_question=question,
+                    created_by_admin=request.user,
+                )
+            invalidate_dashboard_metrics()
         messages.success(request, "操作を反映しました。")
         return redirect("admin-question-list")
 
-    stats = (
-        Question.objects.values("id")
-        .annotate(
-            phase1_total=Count("session_questions", filter=Q(session_questions__phase1_is_correct__isnull=False)),
-            phase1_correct=Count("session_questions", filter=Q(session_questions__phase1_is_correct=True)),
-            phase2_points=Count("session_questions__phase2_score"),
-        )
-    )
-    stats_by_id = {row["id"]: row for row in stats}
+    # Keyset pagination on -id: ?before=<last id of the previous page>.
+    if before.isdigit():
+        questions = questions.filter(id__lt=int(before))
+    page_size = settings.ADMIN_QUESTION_PAGE_SIZE
+    page = list(questions[: page_size + 1])
+    has_next = len(page) > page_size
+    page = page[:page_size]
+
+    stats_by_id = get_question_stats([question.id for question in page])
     return render(
         request,
         "admin_portal/question_list.html",
-        {"questions": questions, "stats_by_id": stats_by_id},
+        {
+            "questions": page,
+            "stats_by_id": stats_by_id,
+            "next_before": page[-1].id if has_next else None,
+            "is_first_page": not before.isdigit(),
+        },
     )
 
 
 @staff_member_required
 def option_retry_view(request, option_id):
     option = get_object_or_404(Option, id=option_id, author_type=Option.AuthorType.AI)
-    retry_option_generation(option)
+    bypass_cache = request.GET.get("bypass_cache") == "1"
+    if settings.GENERATION_ASYNC_JOBS:
+        enqueue_option_retry(option, bypass_cache=bypass_cache, requested_by=request.user)
+        messages.info(request, f"Option #{option.id} の再試行ジョブを登録しました。")
+        return redirect("admin-question-list")
+    retry_option_generation(option, bypass_cache=bypass_cache)
     messages.info(request, f"Option #{option.id} の再試行を実行しました。")
     return redirect("admin-question-list")
 
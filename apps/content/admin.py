@@ -1,9 +1,15 @@
 from django.contrib import admin
 
+from apps.admin_portal.services.dashboard_metrics import invalidate_dashboard_metrics
+from apps.quiz.services.answer_key import invalidate_answer_key
+from apps.quiz.services.question_pool import sync_question_pool
+
 from .models import (
+    GenerationCacheEntry,
     GenerationProfile,
     Genre,
     LlmModel,
+    ModelCircuitState,
     Option,
     Question,
     Scenario,
@@ -67,10 +73,34 @@ class QuestionAdmin(admin.ModelAdmin):
     search_fields = ("id", "scenario__user_message_text")
     inlines = [OptionInline]
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        invalidate_answer_key(form.instance.id)
+        sync_question_pool([form.instance.id])
+        invalidate_dashboard_metrics()
+
 
 @admin.register(Option)
 class OptionAdmin(admin.ModelAdmin):
     list_display = ("id", "question", "author_type", "llm_model", "generation_status", "created_at")
     list_filter = ("author_type", "generation_status")
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_answer_key(obj.question_id)
+        sync_question_pool([obj.question_id])
+        invalidate_dashboard_metrics()
+
+
+@admin.register(GenerationCacheEntry)
+class GenerationCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "api_model_name", "hit_count", "miss_count", "expires_at", "updated_at")
+    search_fields = ("cache_key", "api_model_name")
+
+
+@admin.register(ModelCircuitState)
+class ModelCircuitStateAdmin(admin.ModelAdmin):
+    list_display = ("scope", "key", "state", "consecutive_failures", "retry_at", "updated_at")
+    list_filter = ("scope", "state")
+
 # Register your models here.
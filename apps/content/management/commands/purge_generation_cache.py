@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.content.models import GenerationCacheEntry
+from apps.content.services.generation_cache import purge_expired_generations
+
+
+class Command(BaseCommand):
+    help = "Delete expired generation cache entries, or every entry with --all."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Delete every cached generation.")
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            deleted, _ = GenerationCacheEntry.objects.all().delete()
+        else:
+            deleted = purge_expired_generations()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} cached generations."))
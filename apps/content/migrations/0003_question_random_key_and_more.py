@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:19
+
+import random
+
+import apps.content.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def randomize_existing_keys(apps, schema_editor):
+    Question = apps.get_model("content", "Question")
+    batch = []
+    for question in Question.objects.only("id").iterator(chunk_size=1000):
+        question.random_key = random.random()
+        batch.append(question)
+        if len(batch) >= 1000:
+            Question.objects.bulk_update(batch, ["random_key"])
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, ["random_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_option_option_author_type_llm_model_match_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='random_key',
+            field=models.FloatField(default=apps.content.models.generate_random_key),
+        ),
+        migrations.RunPython(randomize_existing_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['status', 'difficulty', 'choice_count', 'random_key'], name='question_random_pick_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_question_random_key_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='answer_key_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
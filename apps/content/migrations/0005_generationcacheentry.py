@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_question_answer_key_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=64, unique=True)),
+                ('api_model_name', models.CharField(max_length=100)),
+                ('content_text', models.TextField()),
+                ('request_payload_json', models.JSONField(blank=True, null=True)),
+                ('response_payload_json', models.JSONField(blank=True, null=True)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('miss_count', models.PositiveIntegerField(default=1)),
+                ('expires_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
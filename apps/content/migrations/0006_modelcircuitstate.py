@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_generationcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelCircuitState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('provider', 'Provider'), ('model', 'Model')], max_length=20)),
+                ('key', models.CharField(max_length=100)),
+                ('state', models.CharField(choices=[('closed', 'Closed'), ('open', 'Open'), ('half_open', 'Half open')], default='closed', max_length=20)),
+                ('consecutive_failures', models.PositiveIntegerField(default=0)),
+                ('opened_at', models.DateTimeField(blank=True, null=True)),
+                ('retry_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'key'), name='unique_circuit_per_scope_key')],
+            },
+        ),
+    ]
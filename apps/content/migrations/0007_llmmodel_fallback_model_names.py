@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_modelcircuitstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmmodel',
+            name='fallback_model_names',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
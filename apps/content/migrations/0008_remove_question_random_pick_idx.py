@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:14
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0007_llmmodel_fallback_model_names'),
+        ('quiz', '0002_eligiblequestion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='question',
+            name='question_random_pick_idx',
+        ),
+    ]
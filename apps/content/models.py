@@ -1,8 +1,14 @@
+import random
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
 
 
+def generate_random_key():
+    return random.random()
+
+
 class Genre(models.Model):
     slug = models.SlugField(unique=True)
     name = models.CharField(max_length=100)
@@ -60,6 +66,7 @@ class LlmModel(models.Model):
     display_group_slug = models.SlugField(max_length=50)
     display_name = models.CharField(max_length=100)
     api_model_name = models.CharField(max_length=100)
+    fallback_model_names = models.JSONField(default=list, blank=True)
     is_active = models.BooleanField(default=True)
     deprecated_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -75,6 +82,34 @@ class LlmModel(models.Model):
             ),
         ]
 
+    def clean(self):
+        fallbacks = self.fallback_model_names
+        if not isinstance(fallbacks, list) or not all(
+            isinstance(name, str) and name for name in fallbacks
+        ):
+            raise ValidationError({"fallback_model_names": "Fallbacks must be a list of model names."})
+        if self.api_model_name in fallbacks or len(set(fallbacks)) != len(fallbacks):
+            raise ValidationError(
+                {"fallback_model_names": "Fallbacks must be distinct from each other and the primary."}
+            )
+        # A fallback answers as this option, so it must come from the same provider or group.
+        vendor = f"{self.api_model_name.split('/', 1)[0]}/"
+        same_group = set(
+            LlmModel.objects.filter(display_group=self.display_group).values_list(
+                "api_model_name", flat=True
+            )
+        )
+        outside = [name for name in fallbacks if not name.startswith(vendor) and name not in same_group]
+        if outside:
+            raise ValidationError(
+                {
+                    "fallback_model_names": (
+                        f"Fallbacks must stay within {vendor} or {self.display_group}: "
+                        f"{', '.join(outside)}"
+                    )
+                }
+            )
+
     def __str__(self):
         return f"{self.display_name} ({self.api_model_name})"
 
@@ -121,6 +156,8 @@ class Question(models.Model):
         related_name="variants",
     )
     published_at = models.DateTimeField(null=True, blank=True)
+    random_key = models.FloatField(default=generate_random_key)
+    answer_key_version = models.PositiveIntegerField(default=0)
     created_by_admin = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.PROTECT,
@@ -200,4 +237,49 @@ class Option(models.Model):
     def __str__(self):
         return f"Option#{self.pk} ({self.author_type})"
 
+
+class GenerationCacheEntry(models.Model):
+    cache_key = models.CharField(max_length=64, unique=True)
+    api_model_name = models.CharField(max_length=100)
+    content_text = models.TextField()
+    request_payload_json = models.JSONField(blank=True, null=True)
+    response_payload_json = models.JSONField(blank=True, null=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    miss_count = models.PositiveIntegerField(default=1)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"GenerationCacheEntry({self.api_model_name}, {self.cache_key[:12]})"
+
+
+class ModelCircuitState(models.Model):
+    class Scope(models.TextChoices):
+        PROVIDER = "provider", "Provider"
+        MODEL = "model", "Model"
+
+    class State(models.TextChoices):
+        CLOSED = "closed", "Closed"
+        OPEN = "open", "Open"
+        HALF_OPEN = "half_open", "Half open"
+
+    scope = models.CharField(max_length=20, choices=Scope.choices)
+    key = models.CharField(max_length=100)
+    state = models.CharField(max_length=20, choices=State.choices, default=State.CLOSED)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    opened_at = models.DateTimeField(null=True, blank=True)
+    retry_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="unique_circuit_per_scope_key")
+        ]
+
+    def __str__(self):
+        return f"ModelCircuitState({self.scope}:{self.key}={self.state})"
+
 # Create your models here.
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.content.models import ModelCircuitState
+from apps.content.services.openrouter_client import OpenRouterError
+
+
+Scope = ModelCircuitState.Scope
+State = ModelCircuitState.State
+
+
+class CircuitOpenError(OpenRouterError):
+    pass
+
+
+def _scopes(llm_model):
+    return [(Scope.PROVIDER, llm_model.provider), (Scope.MODEL, llm_model.api_model_name)]
+
+
+def _circuits(llm_model):
+    condition = Q()
+    for scope, key in _scopes(llm_model):
+        condition |= Q(scope=scope, key=key)
+    return ModelCircuitState.objects.filter(condition)
+
+
+def _cooldown():
+    return timedelta(seconds=settings.CIRCUIT_BREAKER_COOLDOWN_SECONDS)
+
+
+def before_call(llm_model, *, now=None):
+    now = now or timezone.now()
+    for circuit in _circuits(llm_model).exclude(state=State.CLOSED):
+        if circuit.retry_at and circuit.retry_at <= now:
+            # Cooldown is over: the one caller whose update lands runs the half-open probe.
+            claimed = ModelCircuitState.objects.filter(
+                id=circuit.id, state=circuit.state, retry_at=circuit.retry_at
+            ).update(state=State.HALF_OPEN, retry_at=now + _cooldown(), updated_at=now)
+            if claimed:
+                continue
+        raise CircuitOpenError(
+            f"Circuit open for {circuit.scope} {circuit.key}; failing fast until "
+            f"{timezone.localtime(circuit.retry_at):%H:%M:%S}",
+            status_code="circuit_open",
+            retryable=False,
+        )
+
+
+def _counts_as_outage(error):
+    return (
+        isinstance(error, OpenRouterError)
+        and not isinstance(error, CircuitOpenError)
+        and error.retryable
+        and error.status_code != 429
+    )
+
+
+def record_success(llm_model):
+    _circuits(llm_model).exclude(state=State.CLOSED, consecutive_failures=0).update(
+        state=State.CLOSED,
+        consecutive_failures=0,
+        opened_at=None,
+        retry_at=None,
+        last_error="",
+        updated_at=timezone.now(),
+    )
+
+
+def record_failure(llm_model, error, *, now=None):
+    if not _counts_as_outage(error):
+        return
+    now = now or timezone.now()
+    message = f"{error.status_code or 'network'}:{str(error)[:200]}"
+    for scope, key in _scopes(llm_model):
+        circuit, _ = ModelCircuitState.objects.get_or_create(scope=scope, key=key)
+        circuits = ModelCircuitState.objects.filter(id=circuit.id)
+        circuits.update(
+            consecutive_failures=F("consecutive_failures") + 1, last_error=message, updated_at=now
+        )
+        circuits.filter(
+            Q(state=State.HALF_OPEN)
+            | Q(state=State.CLOSED, consecutive_failures__gte=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD)
+        ).update(state=State.OPEN, opened_at=now, retry_at=now + _cooldown())
+
+
+def record_outcome(llm_model, outcome):
+    if isinstance(outcome, OpenRouterError):
+        record_failure(llm_model, outcome)
+    else:
+        record_success(llm_model)
+
+
+def circuit_overview():
+    return list(
+        ModelCircuitState.objects.exclude(state=State.CLOSED, consecutive_failures=0).order_by(
+            "scope", "key"
+        )
+    )
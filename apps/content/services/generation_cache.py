@@ -0,0 +1,89 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from apps.content.models import GenerationCacheEntry
+from apps.content.services.openrouter_client import OpenRouterResult
+
+
+def generation_cache_key(
+    *, api_model_name, system_prompt, user_prompt, temperature=None, seed=None, max_tokens=None
+):
+    # Without a seed the same request may legitimately return a different completion.
+    if seed is None:
+        return None
+    material = json.dumps(
+        [api_model_name, system_prompt or "", user_prompt, temperature, seed, max_tokens],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _expires_at(now):
+    ttl = settings.GENERATION_CACHE_TTL_SECONDS
+    return now + timedelta(seconds=ttl) if ttl else None
+
+
+def get_cached_generation(cache_key):
+    if cache_key is None or not settings.GENERATION_CACHE_ENABLED:
+        return None
+    now = timezone.now()
+    entries = GenerationCacheEntry.objects.filter(cache_key=cache_key)
+    live = entries.filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+    entry = live.first()
+    if entry is None:
+        # A brand-new entry starts at miss_count=1, so only existing (expired) rows count here.
+        entries.update(miss_count=F("miss_count") + 1)
+        return None
+    live.update(hit_count=F("hit_count") + 1, last_hit_at=now)
+    return OpenRouterResult(
+        content_text=entry.content_text,
+        response_payload={**(entry.response_payload_json or {}), "cache_hit": True},
+        request_payload=entry.request_payload_json or {},
+    )
+
+
+def store_generation(cache_key, *, api_model_name, result):
+    if cache_key is None or not settings.GENERATION_CACHE_ENABLED:
+        return
+    now = timezone.now()
+    values = {
+        "api_model_name": api_model_name,
+        "content_text": result.content_text,
+        "request_payload_json": result.request_payload,
+        "response_payload_json": result.response_payload,
+        "expires_at": _expires_at(now),
+    }
+    entries = GenerationCacheEntry.objects.filter(cache_key=cache_key)
+    if entries.update(updated_at=now, **values):
+        return
+    try:
+        with transaction.atomic():
+            GenerationCacheEntry.objects.create(cache_key=cache_key, **values)
+    except IntegrityError:
+        entries.update(updated_at=now, **values)
+
+
+def purge_expired_generations(*, now=None):
+    now = now or timezone.now()
+    deleted, _ = GenerationCacheEntry.objects.filter(expires_at__lte=now).delete()
+    return deleted
+
+
+def generation_cache_stats():
+    totals = GenerationCacheEntry.objects.aggregate(hits=Sum("hit_count"), misses=Sum("miss_count"))
+    hits = totals["hits"] or 0
+    misses = totals["misses"] or 0
+    requests = hits + misses
+    return {
+        "entries": GenerationCacheEntry.objects.count(),
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / requests * 100 if requests else None,
+    }
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _cache():
+    return caches[settings.OPENROUTER_RATE_LIMIT_CACHE]
+
+
+def _latency_key(api_model_name):
+    return f"openrouter:latency:{api_model_name}"
+
+
+def observed_latency(api_model_name):
+    return _cache().get(_latency_key(api_model_name))
+
+
+def _failure_key(api_model_name):
+    return f"openrouter:failed:{api_model_name}"
+
+
+def _update_latency(cache, api_model_name, latency_ms):
+    key = _latency_key(api_model_name)
+    previous = cache.get(key)
+    alpha = settings.OPENROUTER_LATENCY_EWMA_ALPHA
+    value = latency_ms if previous is None else alpha * latency_ms + (1 - alpha) * previous
+    cache.set(key, value, settings.OPENROUTER_LATENCY_WINDOW_SECONDS)
+    return value
+
+
+def observe_latency(api_model_name, latency_ms):
+    cache = _cache()
+    cache.delete(_failure_key(api_model_name))
+    return _update_latency(cache, api_model_name, latency_ms)
+
+
+def observe_failure(api_model_name):
+    # A 429/5xx counts as a full timeout so routing drifts away from the failing route,
+    # and marks the route as recently failed until it answers again or the window ends.
+    cache = _cache()
+    cache.set(_failure_key(api_model_name), True, settings.OPENROUTER_LATENCY_WINDOW_SECONDS)
+    return _update_latency(cache, api_model_name, settings.OPENROUTER_TIMEOUT_SECONDS * 1000)
+
+
+def route(api_model_name, fallback_model_names=()):
+    fallbacks = [
+        name for name in dict.fromkeys(fallback_model_names or ()) if name != api_model_name
+    ]
+    if not fallbacks:
+        return [api_model_name]
+    cache = _cache()
+    latencies = cache.get_many([_latency_key(name) for name in fallbacks])
+    # Measured fallbacks fastest first; unmeasured ones keep chain order behind them.
+    fallbacks.sort(
+        key=lambda name: (_latency_key(name) not in latencies, latencies.get(_latency_key(name), 0.0))
+    )
+    # The admin-selected model answers unless it failed recently; speed alone never demotes it.
+    if cache.get(_failure_key(api_model_name)):
+        return [*fallbacks, api_model_name]
+    return [api_model_name, *fallbacks]
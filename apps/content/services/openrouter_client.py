@@ -1,17 +1,27 @@
+import asyncio
+import json
+import os
 import random
+import threading
 import time
+import weakref
 from dataclasses import dataclass
 
 import httpx
 from django.conf import settings
 
+from apps.content.services import model_routing, rate_limiter
+
 
 class OpenRouterError(Exception):
-    def __init__(self, message, status_code=None, retryable=False, response_text=None):
+    def __init__(
+        self, message, status_code=None, retryable=False, response_text=None, retry_after=None
+    ):
         super().__init__(message)
         self.status_code = status_code
         self.retryable = retryable
         self.response_text = response_text
+        self.retry_after = retry_after
 
 
 @dataclass
@@ -21,12 +31,207 @@ class OpenRouterResult:
     request_payload: dict
 
 
+_client_lock = threading.Lock()
+_client = None
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _client_options():
+    return {
+        "timeout": settings.OPENROUTER_TIMEOUT_SECONDS,
+        "limits": httpx.Limits(
+            max_connections=settings.OPENROUTER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENROUTER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENROUTER_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        "http2": settings.OPENROUTER_HTTP2,
+    }
+
+
+def get_client():
+    global _client
+    client = _client
+    if client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(**_client_options())
+            client = _client
+    return client
+
+
+def get_async_client():
+    # AsyncClient connections belong to the loop that opened them, so keep one per loop.
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(**_client_options())
+            _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client():
+    # Call before the owning loop finishes (e.g. at the end of asyncio.run's coroutine).
+    with _client_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def close_clients():
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+        async_clients = list(_async_clients.items())
+        _async_clients.clear()
+    if client is not None:
+        client.close()
+    for loop, async_client in async_clients:
+        # aclose() has to run on the loop that owns the connections. A closed loop can
+        # no longer run it, which is why async callers should use aclose_async_client().
+        if loop.is_closed():
+            continue
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(async_client.aclose(), loop)
+        else:
+            loop.run_until_complete(async_client.aclose())
+
+
+def _reset_after_fork():
+    # The child must not reuse sockets owned by the parent; drop them unclosed.
+    global _client, _client_lock, _async_clients
+    _client_lock = threading.Lock()
+    _client = None
+    _async_clients = weakref.WeakKeyDictionary()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def _sleep_backoff(attempt_index):
     backoff_seconds = min(2**attempt_index, 8)
     jitter = random.uniform(0, 0.25)
     time.sleep(backoff_seconds + jitter)
 
 
+def _raise_for_status(response, api_model_name):
+    retry_at = rate_limiter.observe_response(
+        api_model_name, response.status_code, response.headers
+    )
+    if response.status_code < 400:
+        return
+    response.read()
+    if response.status_code in (429, 500, 502, 503, 504):
+        raise OpenRouterError(
+            "Retryable OpenRouter error",
+            status_code=response.status_code,
+            retryable=True,
+            response_text=response.text[:500],
+            retry_after=retry_at,
+        )
+    if response.status_code in (400, 401, 402):
+        raise OpenRouterError(
+            "Non-retryable OpenRouter error",
+            status_code=response.status_code,
+            retryable=False,
+            response_text=response.text[:500],
+        )
+    raise OpenRouterError(
+        "Unexpected OpenRouter error",
+        status_code=response.status_code,
+        retryable=False,
+        response_text=response.text[:500],
+    )
+
+
+def _complete(client, endpoint, payload, headers):
+    response = client.post(
+        endpoint, json=payload, headers=headers, timeout=settings.OPENROUTER_TIMEOUT_SECONDS
+    )
+    _raise_for_status(response, payload["model"])
+    data = response.json()
+    try:
+        content_text = data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError) as exc:
+        raise OpenRouterError("Invalid OpenRouter response format") from exc
+    response_payload = {
+        "id": data.get("id"),
+        "model": data.get("model"),
+        "created": data.get("created"),
+        "usage": data.get("usage", {}),
+    }
+    return content_text, response_payload
+
+
+def _stream_complete(client, endpoint, payload, headers):
+    # The read timeout only covers the gap between chunks, so a stalled model
+    # fails after OPENROUTER_STREAM_IDLE_TIMEOUT_SECONDS instead of the full timeout.
+    idle_timeout = settings.OPENROUTER_STREAM_IDLE_TIMEOUT_SECONDS
+    timeout = httpx.Timeout(settings.OPENROUTER_TIMEOUT_SECONDS, read=idle_timeout)
+    started = time.monotonic()
+    last_chunk_at = started
+    first_token_at = None
+    parts = []
+    chunk_count = 0
+    meta = {}
+    with client.stream("POST", endpoint, json=payload, headers=headers, timeout=timeout) as response:
+        _raise_for_status(response, payload["model"])
+        for line in response.iter_lines():
+            now = time.monotonic()
+            if not line.startswith("data:"):
+                # Comment keep-alives (": OPENROUTER PROCESSING") do not count as progress.
+                if now - last_chunk_at > idle_timeout:
+                    raise OpenRouterError("OpenRouter stream stalled", retryable=True)
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data)
+            except ValueError as exc:
+                raise OpenRouterError("Invalid OpenRouter stream chunk") from exc
+            if chunk.get("error"):
+                error = chunk["error"]
+                raise OpenRouterError(
+                    "OpenRouter stream error",
+                    status_code=error.get("code") if isinstance(error, dict) else None,
+                    retryable=True,
+                    response_text=json.dumps(error)[:500],
+                )
+            last_chunk_at = now
+            for key in ("id", "model", "created", "usage"):
+                if chunk.get(key) is not None:
+                    meta[key] = chunk[key]
+            for choice in chunk.get("choices") or []:
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    if first_token_at is None:
+                        first_token_at = now
+                    parts.append(content)
+                    chunk_count += 1
+
+    finished = time.monotonic()
+    if first_token_at is None:
+        raise OpenRouterError("OpenRouter stream ended without content")
+    usage = meta.get("usage") or {}
+    completion_tokens = usage.get("completion_tokens") or chunk_count
+    generation_seconds = finished - first_token_at
+    response_payload = {
+        "id": meta.get("id"),
+        "model": meta.get("model"),
+        "created": meta.get("created"),
+        "usage": usage,
+        "stream": True,
+        "ttft_ms": round((first_token_at - started) * 1000, 1),
+        "duration_ms": round((finished - started) * 1000, 1),
+        "tokens_per_second": (
+            round(completion_tokens / generation_seconds, 2) if generation_seconds > 0 else None
+        ),
+    }
+    return "".join(parts), response_payload
+
+
 def generate(
     *,
     api_model_name,
@@ -35,9 +240,13 @@ def generate(
     temperature=None,
     seed=None,
     max_tokens=None,
+    stream=None,
+    fallback_model_names=(),
 ):
     if not settings.OPENROUTER_API_KEY:
         raise OpenRouterError("OPENROUTER_API_KEY is not configured.")
+    if stream is None:
+        stream = settings.OPENROUTER_STREAM
 
     payload = {
         "model": api_model_name,
@@ -45,8 +254,10 @@ def generate(
             {"role": "system", "content": system_prompt or ""},
             {"role": "user", "content": user_prompt},
         ],
-        "stream": False,
+        "stream": stream,
     }
+    if stream:
+        payload["stream_options"] = {"include_usage": True}
     if temperature is not None:
         payload["temperature"] = temperature
     if seed is not None:
@@ -61,75 +272,64 @@ def generate(
 
     max_attempts = max(settings.OPENROUTER_MAX_RETRIES, 1)
     last_error = None
-    timeout = settings.OPENROUTER_TIMEOUT_SECONDS
     endpoint = f"{settings.OPENROUTER_BASE_URL}/chat/completions"
+    complete = _stream_complete if stream else _complete
 
-    with httpx.Client(timeout=timeout) as client:
-        for attempt in range(max_attempts):
+    client = get_client()
+    candidates = model_routing.route(api_model_name, fallback_model_names)
+    for attempt in range(max_attempts):
+        rate_limited = 0
+        for served_model in candidates:
+            try:
+                rate_limiter.acquire(served_model)
+            except rate_limiter.RateLimitTimeout as exc:
+                last_error = OpenRouterError(str(exc), status_code=429, retryable=True)
+                last_error.__cause__ = exc
+                rate_limited += 1
+                continue
+            payload["model"] = served_model
+            started = time.monotonic()
             try:
-                response = client.post(endpoint, json=payload, headers=headers)
+                content_text, response_payload = complete(client, endpoint, payload, headers)
             except httpx.RequestError as exc:
-                last_error = OpenRouterError(
-                    f"Network error: {exc}",
-                    retryable=True,
-                )
-                if attempt < max_attempts - 1:
-                    _sleep_backoff(attempt)
-                    continue
-                raise last_error from exc
-
-            if response.status_code in (429, 500, 502, 503, 504):
-                last_error = OpenRouterError(
-                    "Retryable OpenRouter error",
-                    status_code=response.status_code,
-                    retryable=True,
-                    response_text=response.text[:500],
-                )
-                if attempt < max_attempts - 1:
-                    _sleep_backoff(attempt)
-                    continue
-                raise last_error
-
-            if response.status_code in (400, 401, 402):
-                raise OpenRouterError(
-                    "Non-retryable OpenRouter error",
-                    status_code=response.status_code,
-                    retryable=False,
-                    response_text=response.text[:500],
-                )
+                last_error = OpenRouterError(f"Network error: {exc}", retryable=True)
+                last_error.__cause__ = exc
+                model_routing.observe_failure(served_model)
+                continue
+            except OpenRouterError as exc:
+                if not exc.retryable:
+                    raise
+                last_error = exc
+                model_routing.observe_failure(served_model)
+                continue
 
-            if response.status_code >= 400:
-                raise OpenRouterError(
-                    "Unexpected OpenRouter error",
-                    status_code=response.status_code,
-                    retryable=False,
-                    response_text=response.text[:500],
-                )
-
-            data = response.json()
-            try:
-                content_text = data["choices"][0]["message"]["content"]
-            except (KeyError, IndexError, TypeError) as exc:
-                raise OpenRouterError("Invalid OpenRouter response format") from exc
-
-            response_payload = {
-                "id": data.get("id"),
-                "model": data.get("model"),
-                "created": data.get("created"),
-                "usage": data.get("usage", {}),
-            }
+            model_routing.observe_latency(
+                served_model,
+                response_payload.get("ttft_ms") or (time.monotonic() - started) * 1000,
+            )
+            # Grading trusts the option's model, so keep the route that actually answered.
+            response_payload["served_model"] = served_model
             request_payload = {
                 "model": api_model_name,
                 "temperature": temperature,
                 "seed": seed,
                 "max_tokens": max_tokens,
+                "stream": stream,
             }
+            if len(candidates) > 1:
+                request_payload["fallback_model_names"] = list(fallback_model_names)
             return OpenRouterResult(
                 content_text=content_text,
                 response_payload=response_payload,
                 request_payload=request_payload,
             )
 
+        if rate_limited == len(candidates) or attempt == max_attempts - 1:
+            break
+        # With Retry-After / x-ratelimit-reset the limiter already holds the next attempt.
+        if last_error.retry_after is None:
+            _sleep_backoff(attempt)
+
     if last_error:
         raise last_error
     raise OpenRouterError("Unknown OpenRouter error")
@@ -0,0 +1,149 @@
+import math
+import time
+from email.utils import parsedate_to_datetime
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+GLOBAL_SCOPE = "global"
+WINDOW_SECONDS = 60
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+def _now():
+    return time.time()
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+
+
+def _cache():
+    # Any shared backend (redis, memcached, database) makes the limits hold across worker processes.
+    return caches[settings.OPENROUTER_RATE_LIMIT_CACHE]
+
+
+def _limit_for(scope):
+    if scope == GLOBAL_SCOPE:
+        return settings.OPENROUTER_RATE_LIMIT_PER_MINUTE
+    if scope.endswith(":free"):
+        return settings.OPENROUTER_FREE_MODEL_RATE_LIMIT_PER_MINUTE
+    return settings.OPENROUTER_MODEL_RATE_LIMIT_PER_MINUTE
+
+
+def _blocked_key(scope):
+    return f"openrouter:ratelimit:{scope}:blocked_until"
+
+
+def _window_key(scope, now):
+    return f"openrouter:ratelimit:{scope}:{int(now // WINDOW_SECONDS)}"
+
+
+def _take_token(scope, now):
+    # Fixed one-minute windows rather than a refilling bucket: cache.incr is the only atomic
+    # primitive every shared backend offers, and a refill needs compare-and-set. The cost is
+    # that up to 2x `limit` calls can pass around a window boundary; upstream 429s still
+    # land in block() and stop the burst.
+    limit = _limit_for(scope)
+    if not limit:
+        return 0
+    window = int(now // WINDOW_SECONDS)
+    key = _window_key(scope, now)
+    cache = _cache()
+    cache.add(key, 0, timeout=WINDOW_SECONDS * 2)
+    try:
+        used = cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=WINDOW_SECONDS * 2)
+        used = cache.incr(key)
+    if used <= limit:
+        return 0
+    return (window + 1) * WINDOW_SECONDS - now
+
+
+def _refund_token(scope, now):
+    if not _limit_for(scope):
+        return
+    try:
+        _cache().decr(_window_key(scope, now))
+    except ValueError:
+        pass
+
+
+def acquire(api_model_name, *, max_wait=None):
+    max_wait = settings.OPENROUTER_RATE_LIMIT_MAX_WAIT_SECONDS if max_wait is None else max_wait
+    deadline = _now() + max_wait
+    scopes = (api_model_name, GLOBAL_SCOPE)
+    while True:
+        now = _now()
+        blocked_until = max(
+            (_cache().get(_blocked_key(scope)) or 0 for scope in scopes), default=0
+        )
+        wait = blocked_until - now
+        if wait <= 0:
+            taken = []
+            for scope in scopes:
+                wait = _take_token(scope, now)
+                if wait > 0:
+                    # Both scopes are reserved together or not at all.
+                    for taken_scope in taken:
+                        _refund_token(taken_scope, now)
+                    break
+                taken.append(scope)
+        if wait <= 0:
+            return
+        if now + wait > deadline:
+            raise RateLimitTimeout(f"Rate limit for {api_model_name} would need {wait:.1f}s")
+        _sleep(wait)
+
+
+def block(scope, until):
+    now = _now()
+    if until <= now:
+        return
+    cache = _cache()
+    key = _blocked_key(scope)
+    if (cache.get(key) or 0) < until:
+        cache.set(key, until, timeout=math.ceil(until - now) + 1)
+
+
+def _parse_retry_after(value, now):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return now + int(value)
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset(value, now):
+    # x-ratelimit-reset is epoch milliseconds on OpenRouter; accept seconds too.
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+    if reset > 1e12:
+        reset /= 1000
+    elif reset < 1e9:
+        reset += now
+    return reset
+
+
+def observe_response(api_model_name, status_code, headers):
+    now = _now()
+    retry_at = _parse_retry_after(headers.get("retry-after"), now)
+    if status_code == 429 and retry_at is not None:
+        block(api_model_name, retry_at)
+    remaining = headers.get("x-ratelimit-remaining")
+    reset_at = _parse_reset(headers.get("x-ratelimit-reset"), now)
+    if remaining is not None and reset_at is not None and remaining.strip() == "0":
+        block(GLOBAL_SCOPE, reset_at)
+        retry_at = max(retry_at or 0, reset_at)
+    return retry_at
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.quiz.models import QuizSession
+from apps.quiz.services.session_progress import recompute_session_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the progress counters stored on QuizSession from its answered questions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--session-id", type=int, action="append", dest="session_ids")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        sessions = QuizSession.objects.order_by("id")
+        if options["session_ids"]:
+            sessions = sessions.filter(id__in=options["session_ids"])
+        total = 0
+        last_id = 0
+        while batch := list(sessions.filter(id__gt=last_id).only("id")[: options["batch_size"]]):
+            for session in batch:
+                recompute_session_counters(session)
+            total += len(batch)
+            last_id = batch[-1].id
+        self.stdout.write(self.style.SUCCESS(f"Backfilled counters for {total} sessions."))
@@ -0,0 +1,38 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quiz.services.user_stats import compact_user_period_stats, default_compaction_cutoff
+
+
+class Command(BaseCommand):
+    help = "Merge old daily quiz stat buckets into monthly buckets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            help="Compact day buckets of months before this date (YYYY-MM-DD). "
+            "Defaults to, and may not be later than, the oldest month the weekly and "
+            "monthly boards still read.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = default_compaction_cutoff()
+        if options["before"]:
+            try:
+                before = date.fromisoformat(options["before"])
+            except ValueError as exc:
+                raise CommandError(f"Invalid --before date: {options['before']}") from exc
+            if before.replace(day=1) > cutoff:
+                raise CommandError(
+                    f"--before must not be later than {cutoff}; newer day buckets feed the weekly "
+                    "and monthly boards."
+                )
+        else:
+            before = cutoff
+        merged, deleted = compact_user_period_stats(before=before)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Merged {deleted} day buckets into {merged} month buckets before {before.replace(day=1)}."
+            )
+        )
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.quiz.services.reservation_reaper import (
+    REAP_BATCH_SIZE,
+    abandon_idle_sessions,
+    reap_expired_reservations,
+)
+
+
+class Command(BaseCommand):
+    help = "Delete expired question reservations and abandon long-idle quiz sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=REAP_BATCH_SIZE)
+        parser.add_argument(
+            "--idle-hours",
+            type=int,
+            default=None,
+            help="Abandon ACTIVE sessions idle for longer than this (default: SESSION_IDLE_HOURS).",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and repeat every --interval seconds.",
+        )
+        parser.add_argument("--interval", type=int, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            abandoned = abandon_idle_sessions(
+                idle_hours=options["idle_hours"],
+                batch_size=options["batch_size"],
+            )
+            reaped = reap_expired_reservations(batch_size=options["batch_size"])
+            self.stdout.write(f"abandoned_sessions={abandoned} expired_reservations={reaped}")
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
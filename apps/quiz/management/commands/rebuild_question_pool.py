@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quiz.services.question_pool import find_question_pool_drift, rebuild_question_pool
+
+
+class Command(BaseCommand):
+    help = "Rebuild the eligible question pool from scratch, or check it for drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift between the pool and the published questions.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drift = find_question_pool_drift()
+            for label, question_ids in drift.items():
+                preview = ", ".join(str(question_id) for question_id in question_ids[:20])
+                self.stdout.write(f"{label}: {len(question_ids)} {preview}".rstrip())
+            if any(drift.values()):
+                raise CommandError("Eligible question pool has drifted. Run without --check to rebuild.")
+            self.stdout.write(self.style.SUCCESS("Eligible question pool is consistent."))
+            return
+
+        total = rebuild_question_pool()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt eligible question pool with {total} questions."))
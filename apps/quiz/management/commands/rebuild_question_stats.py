@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.quiz.services.question_stats import rebuild_question_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-question answer stats from every answered session question."
+
+    def handle(self, *args, **options):
+        total = rebuild_question_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt answer stats for {total} questions."))
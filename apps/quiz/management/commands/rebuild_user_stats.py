@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.quiz.services.user_stats import rebuild_user_period_stats, rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user lifetime and daily quiz stats from every answered session question."
+
+    def handle(self, *args, **options):
+        total = rebuild_user_stats()
+        buckets = rebuild_user_period_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt stats for {total} users and {buckets} daily buckets.")
+        )
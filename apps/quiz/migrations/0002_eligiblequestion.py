@@ -0,0 +1,69 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+
+
+def populate_pool(apps, schema_editor):
+    Question = apps.get_model("content", "Question")
+    EligibleQuestion = apps.get_model("quiz", "EligibleQuestion")
+    eligible = (
+        Question.objects.filter(status="published")
+        .annotate(
+            option_count=Count("options"),
+            human_count=Count("options", filter=Q(options__author_type="human")),
+            ai_count=Count("options", filter=Q(options__author_type="ai")),
+            ok_count=Count("options", filter=Q(options__generation_status="ok")),
+            ai_model_count=Count(
+                "options__llm_model", filter=Q(options__author_type="ai"), distinct=True
+            ),
+        )
+        .filter(
+            option_count=F("choice_count"),
+            human_count=1,
+            ai_count=F("choice_count") - 1,
+            ok_count=F("choice_count"),
+        )
+        .filter(Q(choice_count=2) | Q(ai_model_count=3))
+        .values_list("id", "difficulty", "choice_count", "random_key")
+    )
+    EligibleQuestion.objects.bulk_create(
+        [
+            EligibleQuestion(
+                question_id=question_id,
+                difficulty=difficulty,
+                choice_count=choice_count,
+                random_key=random_key,
+            )
+            for question_id, difficulty, choice_count, random_key in eligible
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_question_random_key_and_more'),
+        ('quiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EligibleQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('difficulty', models.CharField(max_length=20)),
+                ('choice_count', models.PositiveSmallIntegerField()),
+                ('random_key', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pool_entry', to='content.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['difficulty', 'choice_count', 'random_key'], name='pool_random_pick_idx')],
+                'constraints': [models.UniqueConstraint(fields=('difficulty', 'choice_count', 'question'), name='unique_pool_entry_per_bucket')],
+            },
+        ),
+        migrations.RunPython(populate_pool, migrations.RunPython.noop),
+    ]
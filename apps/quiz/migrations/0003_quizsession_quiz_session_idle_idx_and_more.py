@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_question_random_key_and_more'),
+        ('quiz', '0002_eligiblequestion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(fields=['status', 'updated_at'], name='quiz_session_idle_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userseenquestion',
+            index=models.Index(fields=['status', 'reserved_until'], name='seen_reservation_expiry_idx'),
+        ),
+    ]
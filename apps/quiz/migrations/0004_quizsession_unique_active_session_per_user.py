@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def abandon_duplicate_active_sessions(apps, schema_editor):
+    QuizSession = apps.get_model("quiz", "QuizSession")
+    UserSeenQuestion = apps.get_model("quiz", "UserSeenQuestion")
+    duplicated_user_ids = (
+        QuizSession.objects.filter(status="active")
+        .values("user_id")
+        .annotate(active_count=Count("id"))
+        .filter(active_count__gt=1)
+        .values_list("user_id", flat=True)
+    )
+    for user_id in list(duplicated_user_ids):
+        stale_ids = list(
+            QuizSession.objects.filter(user_id=user_id, status="active")
+            .order_by("-id")
+            .values_list("id", flat=True)[1:]
+        )
+        QuizSession.objects.filter(id__in=stale_ids).update(status="abandoned")
+        UserSeenQuestion.objects.filter(session_id__in=stale_ids, status="reserved").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_quizsession_quiz_session_idle_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(abandon_duplicate_active_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='quizsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'active')), fields=('user',), name='unique_active_session_per_user'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_quizsession_unique_active_session_per_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='phase1_answered_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='phase1_best_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='phase1_correct_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='phase1_current_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='phase2_answered_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='phase2_perfect_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='phase2_points',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
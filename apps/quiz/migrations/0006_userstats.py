@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('quiz', '0005_quizsession_progress_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='quiz_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('phase1_answered', models.PositiveIntegerField(default=0)),
+                ('phase1_correct', models.PositiveIntegerField(default=0)),
+                ('phase2_answered', models.PositiveIntegerField(default=0)),
+                ('phase2_points', models.PositiveIntegerField(default=0)),
+                ('phase2_perfect', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+    ]
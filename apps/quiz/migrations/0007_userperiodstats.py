@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0006_userstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPeriodStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('day', 'Day'), ('month', 'Month')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('phase1_answered', models.PositiveIntegerField(default=0)),
+                ('phase1_correct', models.PositiveIntegerField(default=0)),
+                ('phase2_answered', models.PositiveIntegerField(default=0)),
+                ('phase2_points', models.PositiveIntegerField(default=0)),
+                ('phase2_perfect', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_period_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'period_start'], name='period_stats_range_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'granularity', 'period_start'), name='unique_period_stats_per_user')],
+            },
+        ),
+    ]
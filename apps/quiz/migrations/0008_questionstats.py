@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0007_llmmodel_fallback_model_names'),
+        ('quiz', '0007_userperiodstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='answer_stats', serialize=False, to='content.question')),
+                ('phase1_answered', models.PositiveIntegerField(default=0)),
+                ('phase1_correct', models.PositiveIntegerField(default=0)),
+                ('phase1_timed', models.PositiveIntegerField(default=0)),
+                ('phase1_time_ms_total', models.PositiveBigIntegerField(default=0)),
+                ('phase2_answered', models.PositiveIntegerField(default=0)),
+                ('phase2_points', models.PositiveIntegerField(default=0)),
+                ('phase2_perfect', models.PositiveIntegerField(default=0)),
+                ('phase2_timed', models.PositiveIntegerField(default=0)),
+                ('phase2_time_ms_total', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0007_llmmodel_fallback_model_names'),
+        ('quiz', '0008_questionstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sessionquestion',
+            index=models.Index(fields=['created_at'], name='session_question_created_idx'),
+        ),
+    ]
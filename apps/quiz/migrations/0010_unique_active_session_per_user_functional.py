@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:15
+
+from importlib import import_module
+
+from django.conf import settings
+from django.db import migrations, models
+
+# MySQL never applied the partial constraint of 0004, so duplicates may have appeared since.
+abandon_duplicate_active_sessions = import_module(
+    "apps.quiz.migrations.0004_quizsession_unique_active_session_per_user"
+).abandon_duplicate_active_sessions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_sessionquestion_session_question_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(abandon_duplicate_active_sessions, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='quizsession',
+            name='unique_active_session_per_user',
+        ),
+        migrations.AddConstraint(
+            model_name='quizsession',
+            constraint=models.UniqueConstraint(models.Case(models.When(status='active', then=models.F('user'))), name='unique_active_session_per_user'),
+        ),
+    ]
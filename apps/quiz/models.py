@@ -19,9 +19,29 @@ class QuizSession(models.Model):
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.ACTIVE)
     started_at = models.DateTimeField(auto_now_add=True)
     finished_at = models.DateTimeField(null=True, blank=True)
+    phase1_answered_count = models.PositiveIntegerField(default=0)
+    phase1_correct_count = models.PositiveIntegerField(default=0)
+    phase1_current_streak = models.PositiveIntegerField(default=0)
+    phase1_best_streak = models.PositiveIntegerField(default=0)
+    phase2_answered_count = models.PositiveIntegerField(default=0)
+    phase2_points = models.PositiveIntegerField(default=0)
+    phase2_perfect_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # A functional unique index instead of a partial one: MySQL ignores `condition`,
+            # but enforces an index over an expression that is NULL for every non-active row.
+            models.UniqueConstraint(
+                models.Case(models.When(status="active", then=models.F("user"))),
+                name="unique_active_session_per_user",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["status", "updated_at"], name="quiz_session_idle_idx"),
+        ]
+
     def __str__(self):
         return f"QuizSession#{self.pk}"
 
@@ -60,6 +80,9 @@ class SessionQuestion(models.Model):
                 fields=["session", "question"], name="unique_question_per_session"
             ),
         ]
+        indexes = [
+            models.Index(fields=["created_at"], name="session_question_created_idx"),
+        ]
         ordering = ["order_index"]
 
     def __str__(self):
@@ -99,8 +122,114 @@ class UserSeenQuestion(models.Model):
                 fields=["user", "question"], name="unique_seen_question_per_user"
             )
         ]
+        indexes = [
+            models.Index(fields=["status", "reserved_until"], name="seen_reservation_expiry_idx"),
+        ]
 
     def __str__(self):
         return f"UserSeenQuestion(user={self.user_id}, question={self.question_id})"
 
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="quiz_stats",
+    )
+    phase1_answered = models.PositiveIntegerField(default=0)
+    phase1_correct = models.PositiveIntegerField(default=0)
+    phase2_answered = models.PositiveIntegerField(default=0)
+    phase2_points = models.PositiveIntegerField(default=0)
+    phase2_perfect = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"UserStats(user={self.user_id})"
+
+
+class UserPeriodStats(models.Model):
+    class Granularity(models.TextChoices):
+        DAY = "day", "Day"
+        MONTH = "month", "Month"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="quiz_period_stats",
+    )
+    granularity = models.CharField(max_length=10, choices=Granularity.choices)
+    period_start = models.DateField()
+    phase1_answered = models.PositiveIntegerField(default=0)
+    phase1_correct = models.PositiveIntegerField(default=0)
+    phase2_answered = models.PositiveIntegerField(default=0)
+    phase2_points = models.PositiveIntegerField(default=0)
+    phase2_perfect = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "granularity", "period_start"],
+                name="unique_period_stats_per_user",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["granularity", "period_start"], name="period_stats_range_idx"),
+        ]
+
+    def __str__(self):
+        return f"UserPeriodStats(user={self.user_id}, {self.granularity}={self.period_start})"
+
+
+class QuestionStats(models.Model):
+    question = models.OneToOneField(
+        "content.Question",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="answer_stats",
+    )
+    phase1_answered = models.PositiveIntegerField(default=0)
+    phase1_correct = models.PositiveIntegerField(default=0)
+    phase1_timed = models.PositiveIntegerField(default=0)
+    phase1_time_ms_total = models.PositiveBigIntegerField(default=0)
+    phase2_answered = models.PositiveIntegerField(default=0)
+    phase2_points = models.PositiveIntegerField(default=0)
+    phase2_perfect = models.PositiveIntegerField(default=0)
+    phase2_timed = models.PositiveIntegerField(default=0)
+    phase2_time_ms_total = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"QuestionStats(question={self.question_id})"
+
+
+class EligibleQuestion(models.Model):
+    question = models.OneToOneField(
+        "content.Question",
+        on_delete=models.CASCADE,
+        related_name="pool_entry",
+    )
+    difficulty = models.CharField(max_length=20)
+    choice_count = models.PositiveSmallIntegerField()
+    random_key = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["difficulty", "choice_count", "question"],
+                name="unique_pool_entry_per_bucket",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["difficulty", "choice_count", "random_key"],
+                name="pool_random_pick_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"EligibleQuestion(question={self.question_id})"
+
 # Create your models here.
@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db.models import F
+
+from apps.content.models import Option, Question
+
+
+ANSWER_KEY_TTL_SECONDS = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    question_id: int
+    human_option_id: int
+    ai_groups: dict
+    group_labels: dict
+
+    @property
+    def ai_option_ids(self):
+        return sorted(self.ai_groups)
+
+
+def _cache_key(question):
+    return f"quiz:answer_key:{question.id}:v{question.answer_key_version}"
+
+
+def _load_answer_key(question):
+    human_option_id = None
+    ai_groups = {}
+    group_labels = {}
+    options = Option.objects.filter(question_id=question.id).values_list(
+        "id",
+        "author_type",
+        "llm_model__display_group_slug",
+        "llm_model__display_group",
+    )
+    for option_id, author_type, group_slug, group_label in options:
+        if author_type == Option.AuthorType.HUMAN:
+            human_option_id = option_id
+        else:
+            ai_groups[option_id] = group_slug
+            group_labels[group_slug] = group_label
+    if human_option_id is None:
+        raise Option.DoesNotExist(f"Question#{question.id} has no human option.")
+    return AnswerKey(
+        question_id=question.id,
+        human_option_id=human_option_id,
+        ai_groups=ai_groups,
+        group_labels=group_labels,
+    )
+
+
+def get_answer_key(question):
+    key = _cache_key(question)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = _load_answer_key(question)
+        cache.set(key, answer_key, ANSWER_KEY_TTL_SECONDS)
+    return answer_key
+
+
+def invalidate_answer_keys(question_ids):
+    # Bumping the version on the question row makes every process miss its old entry.
+    Question.objects.filter(id__in=question_ids).update(
+        answer_key_version=F("answer_key_version") + 1
+    )
+
+
+def invalidate_answer_key(question_id):
+    invalidate_answer_keys([question_id])
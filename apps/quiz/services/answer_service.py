@@ -1,12 +1,11 @@
 from django.db import transaction
 from django.utils import timezone
 
-from apps.content.models import Option
-from apps.quiz.models import UserSeenQuestion
-
-
-def _get_human_option_id(question):
-    return question.options.get(author_type=Option.AuthorType.HUMAN).id
+from apps.quiz.models import SessionQuestion, UserSeenQuestion
+from apps.quiz.services.answer_key import get_answer_key
+from apps.quiz.services.question_stats import record_question_phase1, record_question_phase2
+from apps.quiz.services.session_progress import record_phase1_answer, record_phase2_answer
+from apps.quiz.services.user_stats import record_user_phase1, record_user_phase2
 
 
 @transaction.atomic
@@ -16,22 +15,37 @@ def submit_phase1(*, session_question, selected_letter, phase1_time_ms=None):
     if not option_id:
         raise ValueError("Invalid selected letter.")
 
-    human_option_id = _get_human_option_id(session_question.question)
+    human_option_id = get_answer_key(session_question.question).human_option_id
     is_correct = option_id == human_option_id
     now = timezone.now()
-
-    session_question.phase1_selected_letter = selected_letter
-    session_question.phase1_is_correct = is_correct
-    session_question.phase1_answered_at = now
-    session_question.phase1_time_ms = phase1_time_ms
-    session_question.save(
-        update_fields=[
-            "phase1_selected_letter",
-            "phase1_is_correct",
-            "phase1_answered_at",
-            "phase1_time_ms",
-            "updated_at",
-        ]
+    answer = {
+        "phase1_selected_letter": selected_letter,
+        "phase1_is_correct": is_correct,
+        "phase1_answered_at": now,
+        "phase1_time_ms": phase1_time_ms,
+    }
+    # The conditional update is the claim: a double click or a second tab finds the
+    # question already answered, keeps the first answer and records nothing.
+    claimed = SessionQuestion.objects.filter(
+        pk=session_question.pk, phase1_answered_at__isnull=True
+    ).update(updated_at=now, **answer)
+    if not claimed:
+        session_question.refresh_from_db(fields=list(answer))
+        return {
+            "is_correct": session_question.phase1_is_correct,
+            "human_option_id": human_option_id,
+            "selected_option_id": session_question.shuffle_map_json.get(
+                session_question.phase1_selected_letter
+            ),
+        }
+    for field, value in answer.items():
+        setattr(session_question, field, value)
+    record_phase1_answer(session_id=session_question.session_id, is_correct=is_correct)
+    record_user_phase1(user_id=session_question.session.user_id, is_correct=is_correct)
+    record_question_phase1(
+        question_id=session_question.question_id,
+        is_correct=is_correct,
+        time_ms=phase1_time_ms,
     )
 
     seen = UserSeenQuestion.objects.filter(
@@ -51,17 +65,43 @@ def submit_phase1(*, session_question, selected_letter, phase1_time_ms=None):
     }
 
 
+def _score_assignment(answer_key, assignment_map):
+    score = 0
+    details = []
+    for option_id in answer_key.ai_option_ids:
+        assigned_group = assignment_map[str(option_id)]
+        correct_group = answer_key.ai_groups[option_id]
+        matched = assigned_group == correct_group
+        if matched:
+            score += 1
+        details.append(
+            {
+                "option_id": option_id,
+                "assigned_group": assigned_group,
+                "correct_group": correct_group,
+                "is_correct": matched,
+            }
+        )
+    return score, details
+
+
+def _phase2_result(answer_key, score, details):
+    return {
+        "score": score,
+        "is_perfect": score == 3,
+        "details": details,
+        "human_option_id": answer_key.human_option_id,
+    }
+
+
 @transaction.atomic
 def submit_phase2(*, session_question, assignment_map, phase2_time_ms=None):
     question = session_question.question
     if question.choice_count != 4:
         raise ValueError("Phase2 is only available for 4-choice questions.")
 
-    human_option_id = _get_human_option_id(question)
-    ai_options = list(
-        question.options.filter(author_type=Option.AuthorType.AI).select_related("llm_model")
-    )
-    expected_option_ids = {str(option.id) for option in ai_options}
+    answer_key = get_answer_key(question)
+    expected_option_ids = {str(option_id) for option_id in answer_key.ai_option_ids}
     actual_option_ids = set(assignment_map.keys())
     if expected_option_ids != actual_option_ids:
         raise ValueError("Invalid option set for phase2 assignment.")
@@ -70,47 +110,40 @@ def submit_phase2(*, session_question, assignment_map, phase2_time_ms=None):
     if len(set(assigned_groups)) != 3:
         raise ValueError("Duplicate display groups are not allowed.")
 
-    expected_groups = {option.llm_model.display_group_slug for option in ai_options}
+    expected_groups = set(answer_key.ai_groups.values())
     if set(assigned_groups) != expected_groups:
         raise ValueError("Assigned groups must match the question model groups.")
 
-    score = 0
-    details = []
-    for option in ai_options:
-        assigned_group = assignment_map[str(option.id)]
-        correct_group = option.llm_model.display_group_slug
-        matched = assigned_group == correct_group
-        if matched:
-            score += 1
-        details.append(
-            {
-                "option_id": option.id,
-                "assigned_group": assigned_group,
-                "correct_group": correct_group,
-                "is_correct": matched,
-            }
-        )
-
+    score, details = _score_assignment(answer_key, assignment_map)
     is_perfect = score == 3
     now = timezone.now()
-    session_question.phase2_assignment_json = assignment_map
-    session_question.phase2_score = score
-    session_question.phase2_is_perfect = is_perfect
-    session_question.phase2_answered_at = now
-    session_question.phase2_time_ms = phase2_time_ms
-    session_question.save(
-        update_fields=[
-            "phase2_assignment_json",
-            "phase2_score",
-            "phase2_is_perfect",
-            "phase2_answered_at",
-            "phase2_time_ms",
-            "updated_at",
-        ]
-    )
-    return {
-        "score": score,
-        "is_perfect": is_perfect,
-        "details": details,
-        "human_option_id": human_option_id,
+    answer = {
+        "phase2_assignment_json": assignment_map,
+        "phase2_score": score,
+        "phase2_is_perfect": is_perfect,
+        "phase2_answered_at": now,
+        "phase2_time_ms": phase2_time_ms,
     }
+    claimed = SessionQuestion.objects.filter(
+        pk=session_question.pk, phase2_answered_at__isnull=True
+    ).update(updated_at=now, **answer)
+    if not claimed:
+        # Already answered: report the stored assignment instead of the one just posted.
+        session_question.refresh_from_db(fields=list(answer))
+        return _phase2_result(
+            answer_key,
+            *_score_assignment(answer_key, session_question.phase2_assignment_json),
+        )
+    for field, value in answer.items():
+        setattr(session_question, field, value)
+    record_phase2_answer(session_id=session_question.session_id, score=score, is_perfect=is_perfect)
+    record_user_phase2(
+        user_id=session_question.session.user_id, score=score, is_perfect=is_perfect
+    )
+    record_question_phase2(
+        question_id=session_question.question_id,
+        score=score,
+        is_perfect=is_perfect,
+        time_ms=phase2_time_ms,
+    )
+    return _phase2_result(answer_key, score, details)
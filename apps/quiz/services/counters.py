@@ -0,0 +1,21 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+def increment_or_create(queryset, lookup, increments):
+    updates = {field: F(field) + value for field, value in increments.items()}
+    if queryset.update(updated_at=timezone.now(), **updates):
+        return
+    try:
+        with transaction.atomic():
+            queryset.model.objects.create(**lookup, **increments)
+    except IntegrityError:
+        queryset.update(updated_at=timezone.now(), **updates)
+
+
+def lock_counter_rows(model):
+    # Call inside the rebuild's transaction, before aggregating. Locking every row (and on
+    # InnoDB the gaps between them) holds back increment_or_create from in-flight answers
+    # until the new totals commit, so each answer is either aggregated or applied on top.
+    list(model.objects.select_for_update().values_list("pk", flat=True))
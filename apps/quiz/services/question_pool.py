@@ -0,0 +1,102 @@
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from apps.content.models import Option, Question
+from apps.quiz.models import EligibleQuestion
+
+
+POOL_BATCH_SIZE = 1000
+
+
+def eligible_questions_queryset(difficulty=None, choice_count=None):
+    queryset = Question.objects.filter(status=Question.Status.PUBLISHED)
+    if difficulty is not None:
+        queryset = queryset.filter(difficulty=difficulty)
+    if choice_count is not None:
+        queryset = queryset.filter(choice_count=choice_count)
+    return (
+        queryset.annotate(
+            option_count=Count("options"),
+            human_count=Count(
+                "options", filter=Q(options__author_type=Option.AuthorType.HUMAN)
+            ),
+            ai_count=Count("options", filter=Q(options__author_type=Option.AuthorType.AI)),
+            ok_count=Count(
+                "options",
+                filter=Q(options__generation_status=Option.GenerationStatus.OK),
+            ),
+            ai_model_count=Count(
+                "options__llm_model",
+                filter=Q(options__author_type=Option.AuthorType.AI),
+                distinct=True,
+            ),
+        )
+        .filter(
+            option_count=F("choice_count"),
+            human_count=1,
+            ai_count=F("choice_count") - 1,
+            ok_count=F("choice_count"),
+        )
+        .filter(Q(choice_count=2) | Q(ai_model_count=3))
+    )
+
+
+def _pool_entries(queryset):
+    rows = queryset.values_list("id", "difficulty", "choice_count", "random_key")
+    for question_id, difficulty, choice_count, random_key in rows.iterator(
+        chunk_size=POOL_BATCH_SIZE
+    ):
+        yield EligibleQuestion(
+            question_id=question_id,
+            difficulty=difficulty,
+            choice_count=choice_count,
+            random_key=random_key,
+        )
+
+
+def sync_question_pool(question_ids):
+    question_ids = sorted({int(question_id) for question_id in question_ids})
+    if not question_ids:
+        return 0
+    with transaction.atomic():
+        entries = list(_pool_entries(eligible_questions_queryset().filter(id__in=question_ids)))
+        EligibleQuestion.objects.filter(question_id__in=question_ids).delete()
+        EligibleQuestion.objects.bulk_create(entries)
+    return len(entries)
+
+
+def rebuild_question_pool():
+    total = 0
+    with transaction.atomic():
+        EligibleQuestion.objects.all().delete()
+        entries = _pool_entries(eligible_questions_queryset().order_by("id"))
+        while batch := list(islice(entries, POOL_BATCH_SIZE)):
+            EligibleQuestion.objects.bulk_create(batch)
+            total += len(batch)
+    return total
+
+
+def find_question_pool_drift():
+    expected = {
+        question_id: (difficulty, choice_count)
+        for question_id, difficulty, choice_count in eligible_questions_queryset().values_list(
+            "id", "difficulty", "choice_count"
+        )
+    }
+    actual = {
+        question_id: (difficulty, choice_count)
+        for question_id, difficulty, choice_count in EligibleQuestion.objects.values_list(
+            "question_id", "difficulty", "choice_count"
+        )
+    }
+    return {
+        "missing": sorted(set(expected) - set(actual)),
+        "stale": sorted(set(actual) - set(expected)),
+        "mismatched": sorted(
+            question_id
+            for question_id in set(expected) & set(actual)
+            if expected[question_id] != actual[question_id]
+        ),
+    }
@@ -0,0 +1,26 @@
+import random
+
+
+SAMPLE_WINDOW_FACTOR = 4
+
+
+def sample_question_ids(candidates, requested, *, id_field="id", key_field="random_key"):
+    # Probe the indexed random key at a random pivot instead of ORDER BY RAND():
+    # read a small window after the pivot (wrapping to the start of the key
+    # space when the tail is short) and sample from that window in Python.
+    if requested <= 0:
+        return []
+    window = requested * SAMPLE_WINDOW_FACTOR
+    pivot = random.random()
+    picked = list(
+        candidates.filter(**{f"{key_field}__gte": pivot})
+        .order_by(key_field)
+        .values_list(id_field, flat=True)[:window]
+    )
+    if len(picked) < window:
+        picked += list(
+            candidates.filter(**{f"{key_field}__lt": pivot})
+            .order_by(key_field)
+            .values_list(id_field, flat=True)[: window - len(picked)]
+        )
+    return random.sample(picked, min(requested, len(picked)))
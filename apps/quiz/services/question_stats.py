@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from apps.quiz.models import QuestionStats, SessionQuestion
+from apps.quiz.services.counters import increment_or_create, lock_counter_rows
+
+
+STAT_FIELDS = (
+    "phase1_answered",
+    "phase1_correct",
+    "phase1_timed",
+    "phase1_time_ms_total",
+    "phase2_answered",
+    "phase2_points",
+    "phase2_perfect",
+    "phase2_timed",
+    "phase2_time_ms_total",
+)
+
+
+def _timing(time_ms):
+    if time_ms is None or time_ms < 0:
+        return 0, 0
+    return 1, time_ms
+
+
+def _bump_question_stats(question_id, **increments):
+    increment_or_create(
+        QuestionStats.objects.filter(question_id=question_id),
+        {"question_id": question_id},
+        increments,
+    )
+
+
+def record_question_phase1(*, question_id, is_correct, time_ms=None):
+    timed, time_ms_total = _timing(time_ms)
+    _bump_question_stats(
+        question_id,
+        phase1_answered=1,
+        phase1_correct=1 if is_correct else 0,
+        phase1_timed=timed,
+        phase1_time_ms_total=time_ms_total,
+    )
+
+
+def record_question_phase2(*, question_id, score, is_perfect, time_ms=None):
+    timed, time_ms_total = _timing(time_ms)
+    _bump_question_stats(
+        question_id,
+        phase2_answered=1,
+        phase2_points=score,
+        phase2_perfect=1 if is_perfect else 0,
+        phase2_timed=timed,
+        phase2_time_ms_total=time_ms_total,
+    )
+
+
+def get_question_stats(question_ids):
+    return QuestionStats.objects.in_bulk(question_ids)
+
+
+def rebuild_question_stats():
+    totals = {}
+    with transaction.atomic():
+        lock_counter_rows(QuestionStats)
+        timed = Q(phase1_time_ms__gte=0)
+        phase1_rows = (
+            SessionQuestion.objects.exclude(phase1_is_correct__isnull=True)
+            .values("question")
+            .annotate(
+                answered=Count("id"),
+                correct=Count("id", filter=Q(phase1_is_correct=True)),
+                timed=Count("id", filter=timed),
+                time_ms_total=Sum("phase1_time_ms", filter=timed),
+            )
+        )
+        for row in phase1_rows:
+            stats = totals.setdefault(row["question"], dict.fromkeys(STAT_FIELDS, 0))
+            stats["phase1_answered"] = row["answered"]
+            stats["phase1_correct"] = row["correct"]
+            stats["phase1_timed"] = row["timed"]
+            stats["phase1_time_ms_total"] = row["time_ms_total"] or 0
+        timed = Q(phase2_time_ms__gte=0)
+        phase2_rows = (
+            SessionQuestion.objects.exclude(phase2_score__isnull=True)
+            .values("question")
+            .annotate(
+                answered=Count("id"),
+                points=Sum("phase2_score"),
+                perfect=Count("id", filter=Q(phase2_is_perfect=True)),
+                timed=Count("id", filter=timed),
+                time_ms_total=Sum("phase2_time_ms", filter=timed),
+            )
+        )
+        for row in phase2_rows:
+            stats = totals.setdefault(row["question"], dict.fromkeys(STAT_FIELDS, 0))
+            stats["phase2_answered"] = row["answered"]
+            stats["phase2_points"] = row["points"] or 0
+            stats["phase2_perfect"] = row["perfect"]
+            stats["phase2_timed"] = row["timed"]
+            stats["phase2_time_ms_total"] = row["time_ms_total"] or 0
+
+        QuestionStats.objects.all().delete()
+        QuestionStats.objects.bulk_create(
+            [
+                QuestionStats(question_id=question_id, **stats)
+                for question_id, stats in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from apps.quiz.models import QuizSession, SessionQuestion, UserSeenQuestion
+
+
+REAP_BATCH_SIZE = 500
+
+
+def reap_expired_reservations(*, now=None, batch_size=REAP_BATCH_SIZE):
+    now = now or timezone.now()
+    expired = UserSeenQuestion.objects.filter(
+        status=UserSeenQuestion.Status.RESERVED,
+        reserved_until__lt=now,
+    )
+    total = 0
+    while True:
+        ids = list(expired.order_by("reserved_until").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted, _ = expired.filter(id__in=ids).delete()
+        total += deleted
+        if len(ids) < batch_size:
+            break
+    return total
+
+
+def abandon_idle_sessions(*, now=None, idle_hours=None, batch_size=REAP_BATCH_SIZE):
+    now = now or timezone.now()
+    idle_hours = settings.SESSION_IDLE_HOURS if idle_hours is None else idle_hours
+    cutoff = now - timedelta(hours=idle_hours)
+    recent_answers = SessionQuestion.objects.filter(session=OuterRef("pk"), updated_at__gte=cutoff)
+    idle_sessions = QuizSession.objects.filter(
+        status=QuizSession.Status.ACTIVE,
+        updated_at__lt=cutoff,
+    ).exclude(Exists(recent_answers))
+    total = 0
+    while True:
+        ids = list(idle_sessions.order_by("updated_at").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            # Re-check idleness under the row lock: a session answered since the
+            # select above must keep both its status and its reservations.
+            abandoned = list(
+                idle_sessions.filter(id__in=ids)
+                .select_for_update(of=("self",))
+                .values_list("id", flat=True)
+            )
+            total += idle_sessions.filter(id__in=abandoned).update(
+                status=QuizSession.Status.ABANDONED, updated_at=now
+            )
+            UserSeenQuestion.objects.filter(
+                session_id__in=abandoned,
+                status=UserSeenQuestion.Status.RESERVED,
+            ).delete()
+        if len(ids) < batch_size:
+            break
+    return total
@@ -1,13 +1,16 @@
 import random
+from collections import defaultdict
 from datetime import timedelta
 
 from django.conf import settings
-from django.db import transaction
-from django.db.models import Count, Q
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
 from django.utils import timezone
 
-from apps.content.models import Option, Question
-from apps.quiz.models import QuizSession, SessionQuestion, UserSeenQuestion
+from apps.content.models import Option
+from apps.quiz.models import EligibleQuestion, QuizSession, SessionQuestion, UserSeenQuestion
+from apps.quiz.services.question_sampler import sample_question_ids
 
 
 def _cleanup_expired_reservations(user):
@@ -23,46 +26,89 @@ def _letter_sequence(choice_count):
     return ["A", "B"] if choice_count == 2 else ["A", "B", "C", "D"]
 
 
-def _eligible_questions_queryset(difficulty, choice_count):
-    queryset = (
-        Question.objects.filter(
-            status=Question.Status.PUBLISHED,
+def _build_shuffle_map(option_ids, choice_count):
+    option_ids = list(option_ids)
+    random.shuffle(option_ids)
+    letters = _letter_sequence(choice_count)
+    return {letter: option_id for letter, option_id in zip(letters, option_ids)}
+
+
+def _create_session_with_questions(*, user, difficulty, choice_count, question_ids):
+    reserve_ttl = timezone.now() + timedelta(hours=settings.RESERVE_TTL_HOURS)
+    option_ids_by_question = defaultdict(list)
+    for question_id, option_id in (
+        Option.objects.filter(question_id__in=question_ids)
+        .order_by("id")
+        .values_list("question_id", "id")
+    ):
+        option_ids_by_question[question_id].append(option_id)
+    # MySQL upserts through ON DUPLICATE KEY UPDATE and rejects an explicit conflict target.
+    unique_fields = (
+        ["user", "question"]
+        if connection.features.supports_update_conflicts_with_target
+        else None
+    )
+
+    with transaction.atomic():
+        session = QuizSession.objects.create(
+            user=user,
             difficulty=difficulty,
             choice_count=choice_count,
+            num_questions_requested=len(question_ids),
+            status=QuizSession.Status.ACTIVE,
         )
-        .annotate(
-            option_count=Count("options"),
-            human_count=Count(
-                "options", filter=Q(options__author_type=Option.AuthorType.HUMAN)
-            ),
-            ai_count=Count("options", filter=Q(options__author_type=Option.AuthorType.AI)),
-            ok_count=Count(
-                "options",
-                filter=Q(options__generation_status=Option.GenerationStatus.OK),
-            ),
-            ai_model_count=Count(
-                "options__llm_model",
-                filter=Q(options__author_type=Option.AuthorType.AI),
-                distinct=True,
-            ),
+        UserSeenQuestion.objects.bulk_create(
+            [
+                UserSeenQuestion(
+                    user=user,
+                    question_id=question_id,
+                    status=UserSeenQuestion.Status.RESERVED,
+                    session=session,
+                    reserved_until=reserve_ttl,
+                )
+                for question_id in sorted(question_ids)
+            ],
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=["status", "session", "reserved_until"],
         )
-        .filter(
-            option_count=choice_count,
-            human_count=1,
-            ai_count=choice_count - 1,
-            ok_count=choice_count,
+        SessionQuestion.objects.bulk_create(
+            [
+                SessionQuestion(
+                    session=session,
+                    question_id=question_id,
+                    order_index=order_index,
+                    shuffle_map_json=_build_shuffle_map(
+                        option_ids_by_question[question_id], choice_count
+                    ),
+                )
+                for order_index, question_id in enumerate(question_ids)
+            ]
         )
+    return session
+
+
+def _lock_user(user):
+    # Serializes allocations of one user (double submits, several tabs) without
+    # blocking anyone else. SQLite ignores FOR UPDATE and relies on its write lock.
+    get_user_model().objects.select_for_update().filter(pk=user.pk).values_list("pk").first()
+
+
+def _active_session(user):
+    return (
+        QuizSession.objects.filter(user=user, status=QuizSession.Status.ACTIVE)
+        .order_by("-id")
+        .first()
     )
-    if choice_count == 4:
-        queryset = queryset.filter(ai_model_count=3)
-    return queryset
 
 
-def _build_shuffle_map(question, choice_count):
-    option_ids = list(question.options.values_list("id", flat=True))
-    random.shuffle(option_ids)
-    letters = _letter_sequence(choice_count)
-    return {letter: option_id for letter, option_id in zip(letters, option_ids)}
+def _resumed(session):
+    return {
+        "session": session,
+        "resumed": True,
+        "out_of_stock": False,
+        "available_count": None,
+    }
 
 
 def start_or_resume_session(
@@ -79,19 +125,30 @@ def start_or_resume_session(
     if choice_count not in (2, 4):
         raise ValueError("choice_count must be 2 or 4.")
 
-    _cleanup_expired_reservations(user)
-    active_session = (
-        QuizSession.objects.filter(user=user, status=QuizSession.Status.ACTIVE)
-        .order_by("-id")
-        .first()
-    )
+    if settings.RESERVATION_CLEANUP_ON_START:
+        _cleanup_expired_reservations(user)
+    try:
+        with transaction.atomic():
+            _lock_user(user)
+            return _allocate_locked(
+                user=user,
+                difficulty=difficulty,
+                choice_count=choice_count,
+                requested=force_num_questions or num_questions_requested,
+                restart=restart,
+            )
+    except IntegrityError:
+        # Another request won the unique_active_session_per_user race; hand back its session.
+        active_session = _active_session(user)
+        if active_session is None:
+            raise
+        return _resumed(active_session)
+
+
+def _allocate_locked(*, user, difficulty, choice_count, requested, restart):
+    active_session = _active_session(user)
     if active_session and not restart:
-        return {
-            "session": active_session,
-            "resumed": True,
-            "out_of_stock": False,
-            "available_count": None,
-        }
+        return _resumed(active_session)
     if active_session and restart:
         abandon_session(session=active_session, user=user)
 
@@ -104,9 +161,10 @@ def start_or_resume_session(
     )
     seen_question_ids = seen_question_ids.values_list("question_id", flat=True)
 
-    candidates = _eligible_questions_queryset(difficulty, choice_count).exclude(
-        id__in=seen_question_ids
-    )
+    candidates = EligibleQuestion.objects.filter(
+        difficulty=difficulty,
+        choice_count=choice_count,
+    ).exclude(question_id__in=seen_question_ids)
     available_count = candidates.count()
     if available_count <= 0:
         return {
@@ -116,7 +174,6 @@ def start_or_resume_session(
             "available_count": 0,
         }
 
-    requested = force_num_questions or num_questions_requested
     if requested > available_count:
         return {
             "session": None,
@@ -125,40 +182,13 @@ def start_or_resume_session(
             "available_count": available_count,
         }
 
-    selected_question_ids = list(
-        candidates.order_by("?").values_list("id", flat=True)[:requested]
+    selected_question_ids = sample_question_ids(candidates, requested, id_field="question_id")
+    session = _create_session_with_questions(
+        user=user,
+        difficulty=difficulty,
+        choice_count=choice_count,
+        question_ids=selected_question_ids,
     )
-    reserve_ttl = timezone.now() + timedelta(hours=settings.RESERVE_TTL_HOURS)
-
-    with transaction.atomic():
-        session = QuizSession.objects.create(
-            user=user,
-            difficulty=difficulty,
-            choice_count=choice_count,
-            num_questions_requested=requested,
-            status=QuizSession.Status.ACTIVE,
-        )
-        questions = Question.objects.filter(id__in=selected_question_ids).prefetch_related(
-            "options"
-        )
-        question_by_id = {question.id: question for question in questions}
-        for order_index, question_id in enumerate(selected_question_ids):
-            question = question_by_id[question_id]
-            UserSeenQuestion.objects.update_or_create(
-                user=user,
-                question=question,
-                defaults={
-                    "status": UserSeenQuestion.Status.RESERVED,
-                    "session": session,
-                    "reserved_until": reserve_ttl,
-                },
-            )
-            SessionQuestion.objects.create(
-                session=session,
-                question=question,
-                order_index=order_index,
-                shuffle_map_json=_build_shuffle_map(question, choice_count),
-            )
     return {
         "session": session,
         "resumed": False,
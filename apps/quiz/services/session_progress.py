@@ -0,0 +1,62 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.quiz.models import QuizSession
+
+
+def record_phase1_answer(*, session_id, is_correct):
+    updates = {"phase1_answered_count": F("phase1_answered_count") + 1}
+    if is_correct:
+        # best_streak is listed before current_streak: MySQL evaluates SET clauses
+        # left to right, so it must still see the pre-increment streak.
+        updates["phase1_correct_count"] = F("phase1_correct_count") + 1
+        updates["phase1_best_streak"] = Greatest(
+            F("phase1_best_streak"), F("phase1_current_streak") + 1
+        )
+        updates["phase1_current_streak"] = F("phase1_current_streak") + 1
+    else:
+        updates["phase1_current_streak"] = 0
+    QuizSession.objects.filter(pk=session_id).update(updated_at=timezone.now(), **updates)
+
+
+def record_phase2_answer(*, session_id, score, is_perfect):
+    QuizSession.objects.filter(pk=session_id).update(
+        phase2_answered_count=F("phase2_answered_count") + 1,
+        phase2_points=F("phase2_points") + score,
+        phase2_perfect_count=F("phase2_perfect_count") + (1 if is_perfect else 0),
+        updated_at=timezone.now(),
+    )
+
+
+def recompute_session_counters(session):
+    counters = {
+        "phase1_answered_count": 0,
+        "phase1_correct_count": 0,
+        "phase1_current_streak": 0,
+        "phase1_best_streak": 0,
+        "phase2_answered_count": 0,
+        "phase2_points": 0,
+        "phase2_perfect_count": 0,
+    }
+    rows = session.session_questions.order_by("order_index").values_list(
+        "phase1_is_correct", "phase2_score", "phase2_is_perfect"
+    )
+    for phase1_is_correct, phase2_score, phase2_is_perfect in rows:
+        if phase1_is_correct is not None:
+            counters["phase1_answered_count"] += 1
+            if phase1_is_correct:
+                counters["phase1_correct_count"] += 1
+                counters["phase1_current_streak"] += 1
+                counters["phase1_best_streak"] = max(
+                    counters["phase1_best_streak"], counters["phase1_current_streak"]
+                )
+            else:
+                counters["phase1_current_streak"] = 0
+        if phase2_score is not None:
+            counters["phase2_answered_count"] += 1
+            counters["phase2_points"] += phase2_score
+            if phase2_is_perfect:
+                counters["phase2_perfect_count"] += 1
+    QuizSession.objects.filter(pk=session.pk).update(**counters)
+    return counters
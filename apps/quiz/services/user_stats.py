@@ -0,0 +1,172 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from apps.quiz.models import SessionQuestion, UserPeriodStats, UserStats
+from apps.quiz.services.counters import increment_or_create, lock_counter_rows
+
+
+STAT_FIELDS = (
+    "phase1_answered",
+    "phase1_correct",
+    "phase2_answered",
+    "phase2_points",
+    "phase2_perfect",
+)
+
+
+Granularity = UserPeriodStats.Granularity
+
+
+def _bump_user_stats(user_id, **increments):
+    increment_or_create(
+        UserStats.objects.filter(user_id=user_id), {"user_id": user_id}, increments
+    )
+    bucket = {"user_id": user_id, "granularity": Granularity.DAY, "period_start": timezone.localdate()}
+    increment_or_create(UserPeriodStats.objects.filter(**bucket), bucket, increments)
+
+
+def record_user_phase1(*, user_id, is_correct):
+    _bump_user_stats(user_id, phase1_answered=1, phase1_correct=1 if is_correct else 0)
+
+
+def record_user_phase2(*, user_id, score, is_perfect):
+    _bump_user_stats(
+        user_id,
+        phase2_answered=1,
+        phase2_points=score,
+        phase2_perfect=1 if is_perfect else 0,
+    )
+
+
+def get_user_stats(user):
+    return UserStats.objects.filter(user=user).first() or UserStats(user=user)
+
+
+def rebuild_user_stats():
+    totals = {}
+    with transaction.atomic():
+        lock_counter_rows(UserStats)
+        phase1_rows = (
+            SessionQuestion.objects.exclude(phase1_is_correct__isnull=True)
+            .values("session__user")
+            .annotate(
+                answered=Count("id"),
+                correct=Count("id", filter=Q(phase1_is_correct=True)),
+            )
+        )
+        for row in phase1_rows:
+            stats = totals.setdefault(row["session__user"], dict.fromkeys(STAT_FIELDS, 0))
+            stats["phase1_answered"] = row["answered"]
+            stats["phase1_correct"] = row["correct"]
+        phase2_rows = (
+            SessionQuestion.objects.filter(session__choice_count=4)
+            .exclude(phase2_score__isnull=True)
+            .values("session__user")
+            .annotate(
+                answered=Count("id"),
+                points=Sum("phase2_score"),
+                perfect=Count("id", filter=Q(phase2_is_perfect=True)),
+            )
+        )
+        for row in phase2_rows:
+            stats = totals.setdefault(row["session__user"], dict.fromkeys(STAT_FIELDS, 0))
+            stats["phase2_answered"] = row["answered"]
+            stats["phase2_points"] = row["points"] or 0
+            stats["phase2_perfect"] = row["perfect"]
+
+        UserStats.objects.all().delete()
+        UserStats.objects.bulk_create(
+            [UserStats(user_id=user_id, **stats) for user_id, stats in totals.items()],
+            batch_size=1000,
+        )
+    return len(totals)
+
+
+def rebuild_user_period_stats():
+    buckets = {}
+    with transaction.atomic():
+        lock_counter_rows(UserPeriodStats)
+        phase1_rows = (
+            SessionQuestion.objects.exclude(phase1_answered_at__isnull=True)
+            .annotate(day=TruncDate("phase1_answered_at"))
+            .values("session__user", "day")
+            .annotate(
+                answered=Count("id"),
+                correct=Count("id", filter=Q(phase1_is_correct=True)),
+            )
+        )
+        for row in phase1_rows:
+            stats = buckets.setdefault(
+                (row["session__user"], row["day"]), dict.fromkeys(STAT_FIELDS, 0)
+            )
+            stats["phase1_answered"] = row["answered"]
+            stats["phase1_correct"] = row["correct"]
+        phase2_rows = (
+            SessionQuestion.objects.filter(session__choice_count=4)
+            .exclude(phase2_answered_at__isnull=True)
+            .annotate(day=TruncDate("phase2_answered_at"))
+            .values("session__user", "day")
+            .annotate(
+                answered=Count("id"),
+                points=Sum("phase2_score"),
+                perfect=Count("id", filter=Q(phase2_is_perfect=True)),
+            )
+        )
+        for row in phase2_rows:
+            stats = buckets.setdefault(
+                (row["session__user"], row["day"]), dict.fromkeys(STAT_FIELDS, 0)
+            )
+            stats["phase2_answered"] = row["answered"]
+            stats["phase2_points"] = row["points"] or 0
+            stats["phase2_perfect"] = row["perfect"]
+
+        UserPeriodStats.objects.all().delete()
+        UserPeriodStats.objects.bulk_create(
+            [
+                UserPeriodStats(
+                    user_id=user_id, granularity=Granularity.DAY, period_start=day, **stats
+                )
+                for (user_id, day), stats in buckets.items()
+            ],
+            batch_size=1000,
+        )
+    return len(buckets)
+
+
+def default_compaction_cutoff(today=None):
+    # Keep every day bucket the weekly and monthly boards can still read.
+    today = today or timezone.localdate()
+    return (today - timedelta(days=6)).replace(day=1)
+
+
+def compact_user_period_stats(*, before, today=None):
+    before = min(before.replace(day=1), default_compaction_cutoff(today))
+    day_buckets = UserPeriodStats.objects.filter(
+        granularity=Granularity.DAY, period_start__lt=before
+    )
+    rows = (
+        day_buckets.annotate(month=TruncMonth("period_start"))
+        .values("user_id", "month")
+        .annotate(**{field: Sum(field) for field in STAT_FIELDS})
+        .order_by("user_id", "month")
+    )
+    with transaction.atomic():
+        merged = 0
+        for row in rows:
+            bucket = {
+                "user_id": row["user_id"],
+                "granularity": Granularity.MONTH,
+                "period_start": row["month"],
+            }
+            increment_or_create(
+                UserPeriodStats.objects.filter(**bucket),
+                bucket,
+                {field: row[field] for field in STAT_FIELDS},
+            )
+            merged += 1
+        deleted, _ = day_buckets.delete()
+    return merged, deleted
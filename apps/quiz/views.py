@@ -1,22 +1,20 @@
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
 
-from apps.content.models import Option
 from apps.quiz.forms import Phase1Form, Phase2Form, QuizStartForm
 from apps.quiz.models import QuizSession, SessionQuestion
+from apps.quiz.services.answer_key import get_answer_key
 from apps.quiz.services.answer_service import submit_phase1, submit_phase2
 from apps.quiz.services.session_allocator import start_or_resume_session
+from apps.quiz.services.user_stats import get_user_stats
+from apps.ranking.services.leaderboard import rank_windows_for_user
 
 
 def _build_letter_option_map(session_question):
     option_map = {}
-    options = {
-        option.id: option
-        for option in session_question.question.options.select_related("llm_model")
-    }
+    options = {option.id: option for option in session_question.question.options.all()}
     for letter, option_id in session_question.shuffle_map_json.items():
         option_map[letter] = options.get(option_id)
     return option_map
@@ -33,19 +31,16 @@ def _next_url_for_session_question(session, current_index):
 
 
 def _session_phase1_stats(session):
-    answered = session.session_questions.exclude(phase1_is_correct__isnull=True)
-    total = answered.count()
-    correct = answered.filter(phase1_is_correct=True).count()
+    total = session.phase1_answered_count
+    correct = session.phase1_correct_count
     rate = (correct / total * 100) if total else 0
-    streak = 0
-    best_streak = 0
-    for item in answered.order_by("order_index"):
-        if item.phase1_is_correct:
-            streak += 1
-            best_streak = max(best_streak, streak)
-        else:
-            streak = 0
-    return {"total": total, "correct": correct, "rate": rate, "streak": streak, "best_streak": best_streak}
+    return {
+        "total": total,
+        "correct": correct,
+        "rate": rate,
+        "streak": session.phase1_current_streak,
+        "best_streak": session.phase1_best_streak,
+    }
 
 
 @login_required
@@ -132,13 +127,10 @@ def quiz_phase1_result_view(request, session_id, index):
     if not session_question.phase1_answered_at:
         return redirect("quiz-question", session_id=session.id, index=index)
     stats = _session_phase1_stats(session)
-    letter_option_map = _build_letter_option_map(session_question)
-    human_option_id = session_question.question.options.get(
-        author_type=Option.AuthorType.HUMAN
-    ).id
+    human_option_id = get_answer_key(session_question.question).human_option_id
     human_letter = None
-    for letter, option in letter_option_map.items():
-        if option and option.id == human_option_id:
+    for letter, option_id in session_question.shuffle_map_json.items():
+        if option_id == human_option_id:
             human_letter = letter
             break
     if session.choice_count == 4:
@@ -169,15 +161,13 @@ def quiz_phase2_view(request, session_id, index):
     if session_question.phase2_answered_at:
         return redirect("quiz-phase2-result", session_id=session.id, index=index)
 
-    question = session_question.question
-    human_option = question.options.get(author_type=Option.AuthorType.HUMAN)
-    ai_options = list(
-        question.options.filter(author_type=Option.AuthorType.AI).select_related("llm_model")
-    )
-    group_choices = sorted(
-        {(option.llm_model.display_group_slug, option.llm_model.display_group) for option in ai_options},
-        key=lambda item: item[0],
+    answer_key = get_answer_key(session_question.question)
+    letter_option_map = _build_letter_option_map(session_question)
+    ai_options = sorted(
+        (option for option in letter_option_map.values() if option.id in answer_key.ai_groups),
+        key=lambda option: option.id,
     )
+    group_choices = sorted(answer_key.group_labels.items(), key=lambda item: item[0])
     form = Phase2Form(request.POST or None, ai_options=ai_options, group_choices=group_choices)
     error = None
     if request.method == "POST" and form.is_valid():
@@ -191,15 +181,15 @@ def quiz_phase2_view(request, session_id, index):
                 phase2_time_ms=form.cleaned_data.get("phase2_time_ms"),
             )
             return redirect("quiz-phase2-result", session_id=session.id, index=index)
-    letter_option_map = _build_letter_option_map(session_question)
+    human_option_id = answer_key.human_option_id
     phase2_rows = []
     for letter, option in letter_option_map.items():
         phase2_rows.append(
             {
                 "letter": letter,
                 "option": option,
-                "is_human": option.id == human_option.id,
-                "field": form[f"option_{option.id}"] if option.id != human_option.id else None,
+                "is_human": option.id == human_option_id,
+                "field": form[f"option_{option.id}"] if option.id != human_option_id else None,
             }
         )
     return render(
@@ -208,7 +198,7 @@ def quiz_phase2_view(request, session_id, index):
         {
             "session": session,
             "session_question": session_question,
-            "human_option_id": human_option.id,
+            "human_option_id": human_option_id,
             "phase2_rows": phase2_rows,
             "ai_options": ai_options,
             "form": form,
@@ -225,14 +215,13 @@ def quiz_phase2_result_view(request, session_id, index):
     if not session_question.phase2_answered_at:
         return redirect("quiz-phase2", session_id=session.id, index=index)
     question = session_question.question
-    ai_options = list(
-        question.options.filter(author_type=Option.AuthorType.AI).select_related("llm_model")
-    )
+    answer_key = get_answer_key(question)
+    ai_options = question.options.filter(id__in=answer_key.ai_option_ids).order_by("id")
     details = []
     assignment_map = session_question.phase2_assignment_json or {}
     for option in ai_options:
         assigned = assignment_map.get(str(option.id))
-        correct = option.llm_model.display_group_slug
+        correct = answer_key.ai_groups[option.id]
         details.append(
             {
                 "option": option,
@@ -258,9 +247,9 @@ def quiz_phase2_result_view(request, session_id, index):
 def quiz_session_result_view(request, session_id):
     session = get_object_or_404(QuizSession, id=session_id, user=request.user)
     total_questions = session.session_questions.count()
-    phase1_answered = session.session_questions.exclude(phase1_is_correct__isnull=True).count()
+    phase1_answered = session.phase1_answered_count
     if session.choice_count == 4:
-        phase2_answered = session.session_questions.exclude(phase2_score__isnull=True).count()
+        phase2_answered = session.phase2_answered_count
     else:
         phase2_answered = total_questions
     if session.status == QuizSession.Status.ACTIVE and phase1_answered == total_questions and phase2_answered == total_questions:
@@ -268,25 +257,14 @@ def quiz_session_result_view(request, session_id):
         session.finished_at = session.finished_at or timezone.now()
         session.save(update_fields=["status", "finished_at", "updated_at"])
 
-    phase1_correct = session.session_questions.filter(phase1_is_correct=True).count()
+    phase1_correct = session.phase1_correct_count
     phase1_rate = (phase1_correct / total_questions * 100) if total_questions else 0
-    phase2_sum = session.session_questions.aggregate(total=Sum("phase2_score")).get("total") or 0
+    phase2_sum = session.phase2_points
     phase2_max_points = total_questions * 3 if session.choice_count == 4 else 0
     phase2_rate = (phase2_sum / phase2_max_points * 100) if phase2_max_points else 0
-    phase2_perfect = session.session_questions.filter(phase2_is_perfect=True).count()
-
-    total_phase1 = SessionQuestion.objects.filter(session__user=request.user).exclude(
-        phase1_is_correct__isnull=True
-    )
-    total_phase1_count = total_phase1.count()
-    total_phase1_correct = total_phase1.filter(phase1_is_correct=True).count()
+    phase2_perfect = session.phase2_perfect_count
 
-    total_phase2 = SessionQuestion.objects.filter(
-        session__user=request.user,
-        session__choice_count=4,
-    ).exclude(phase2_score__isnull=True)
-    total_phase2_points = total_phase2.aggregate(total=Sum("phase2_score")).get("total") or 0
-    total_phase2_count = total_phase2.count()
+    user_stats = get_user_stats(request.user)
 
     return render(
         request,
@@ -300,10 +278,11 @@ def quiz_session_result_view(request, session_id):
             "phase2_sum": phase2_sum,
             "phase2_max_points": phase2_max_points,
             "phase2_perfect": phase2_perfect,
-            "total_phase1_count": total_phase1_count,
-            "total_phase1_correct": total_phase1_correct,
-            "total_phase2_count": total_phase2_count,
-            "total_phase2_points": total_phase2_points,
+            "total_phase1_count": user_stats.phase1_answered,
+            "total_phase1_correct": user_stats.phase1_correct,
+            "total_phase2_count": user_stats.phase2_answered,
+            "total_phase2_points": user_stats.phase2_points,
+            "rank_windows": rank_windows_for_user(request.user),
         },
     )
 
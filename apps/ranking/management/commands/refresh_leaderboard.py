@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.ranking.models import LeaderboardEntry
+from apps.ranking.services.leaderboard import refresh_leaderboard
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ranking leaderboard snapshots from per-user stats."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-stale",
+            action="store_true",
+            help="Skip boards that have no new answers since the last refresh.",
+        )
+
+    def handle(self, *args, **options):
+        for board in LeaderboardEntry.Board.values:
+            refreshed = refresh_leaderboard(board, force=not options["if_stale"])
+            self.stdout.write(f"{board}: {'refreshed' if refreshed else 'up to date'}")
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('phase1', 'Phase 1'), ('phase2', 'Phase 2')], max_length=20, unique=True)),
+                ('min_total', models.PositiveIntegerField(default=0)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('phase1', 'Phase 1'), ('phase2', 'Phase 2')], max_length=20)),
+                ('rank', models.PositiveIntegerField()),
+                ('total', models.PositiveIntegerField()),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('rate', models.FloatField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['board', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('board', 'rank'), name='unique_rank_per_board'), models.UniqueConstraint(fields=('board', 'user'), name='unique_user_per_board')],
+            },
+        ),
+    ]
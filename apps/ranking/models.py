@@ -1,3 +1,40 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class LeaderboardEntry(models.Model):
+    class Board(models.TextChoices):
+        PHASE1 = "phase1", "Phase 1"
+        PHASE2 = "phase2", "Phase 2"
+
+    board = models.CharField(max_length=20, choices=Board.choices)
+    rank = models.PositiveIntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="leaderboard_entries",
+    )
+    total = models.PositiveIntegerField()
+    correct = models.PositiveIntegerField(default=0)
+    points = models.PositiveIntegerField(default=0)
+    rate = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["board", "rank"], name="unique_rank_per_board"),
+            models.UniqueConstraint(fields=["board", "user"], name="unique_user_per_board"),
+        ]
+        ordering = ["board", "rank"]
+
+    def __str__(self):
+        return f"LeaderboardEntry({self.board}#{self.rank}, user={self.user_id})"
+
+
+class LeaderboardSnapshot(models.Model):
+    board = models.CharField(max_length=20, choices=LeaderboardEntry.Board.choices, unique=True)
+    min_total = models.PositiveIntegerField(default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"LeaderboardSnapshot({self.board})"
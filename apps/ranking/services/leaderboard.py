@@ -0,0 +1,186 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Sum
+from django.utils import timezone
+
+from apps.quiz.models import UserPeriodStats, UserStats
+from apps.ranking.models import LeaderboardEntry, LeaderboardSnapshot
+
+
+Board = LeaderboardEntry.Board
+Granularity = UserPeriodStats.Granularity
+PERIODS = ("day", "week", "month", "all")
+
+
+def _min_total(board):
+    return settings.RANKING_MIN_PHASE1 if board == Board.PHASE1 else settings.RANKING_MIN_PHASE2
+
+
+def _ranked_entries(board):
+    if board == Board.PHASE1:
+        rows = (
+            UserStats.objects.filter(phase1_answered__gte=_min_total(board))
+            .annotate(
+                rate=ExpressionWrapper(
+                    F("phase1_correct") * 100.0 / F("phase1_answered"), output_field=FloatField()
+                )
+            )
+            .order_by("-rate", "-phase1_answered", "-phase1_correct", "user_id")
+            .values_list("user_id", "phase1_answered", "phase1_correct", "rate")
+        )
+        for rank, (user_id, total, correct, rate) in enumerate(rows.iterator(), start=1):
+            yield LeaderboardEntry(
+                board=board, rank=rank, user_id=user_id, total=total, correct=correct, rate=rate
+            )
+        return
+
+    rows = (
+        UserStats.objects.filter(phase2_answered__gte=_min_total(board))
+        .order_by("-phase2_points", "-phase2_answered", "user_id")
+        .values_list("user_id", "phase2_answered", "phase2_points")
+    )
+    for rank, (user_id, total, points) in enumerate(rows.iterator(), start=1):
+        rate = points / (total * 3) * 100 if total else 0
+        yield LeaderboardEntry(
+            board=board, rank=rank, user_id=user_id, total=total, points=points, rate=rate
+        )
+
+
+def _is_stale(snapshot, board, now):
+    if snapshot.refreshed_at is None or snapshot.min_total != _min_total(board):
+        return True
+    if snapshot.refreshed_at > now - timedelta(seconds=settings.LEADERBOARD_REFRESH_SECONDS):
+        return False
+    return UserStats.objects.filter(updated_at__gt=snapshot.refreshed_at).exists()
+
+
+def refresh_leaderboard(board, *, force=True):
+    now = timezone.now()
+    with transaction.atomic():
+        LeaderboardSnapshot.objects.get_or_create(board=board)
+        snapshot = LeaderboardSnapshot.objects.select_for_update().get(board=board)
+        if not force and not _is_stale(snapshot, board, now):
+            return False
+        LeaderboardEntry.objects.filter(board=board).delete()
+        entries = LeaderboardEntry.objects.bulk_create(_ranked_entries(board), batch_size=1000)
+        snapshot.min_total = _min_total(board)
+        snapshot.entry_count = len(entries)
+        snapshot.refreshed_at = now
+        snapshot.save(update_fields=["min_total", "entry_count", "refreshed_at"])
+    return True
+
+
+def leaderboard_page(board, page):
+    page_size = settings.RANKING_PAGE_SIZE
+    first_rank = (page - 1) * page_size + 1
+    entries = list(
+        LeaderboardEntry.objects.filter(
+            board=board,
+            rank__gte=first_rank,
+            rank__lt=first_rank + page_size,
+        )
+        .select_related("user")
+        .order_by("rank")
+    )
+    entry_count = (
+        LeaderboardSnapshot.objects.filter(board=board)
+        .values_list("entry_count", flat=True)
+        .first()
+        or 0
+    )
+    return {
+        "entries": entries,
+        "page": page,
+        "has_previous": page > 1,
+        "has_next": first_rank + page_size <= entry_count,
+    }
+
+
+def _period_buckets(period, today):
+    if period == "day":
+        return Q(granularity=Granularity.DAY, period_start=today)
+    if period == "week":
+        week_start = today - timedelta(days=today.weekday())
+        return Q(granularity=Granularity.DAY, period_start__range=(week_start, today))
+    month_start = today.replace(day=1)
+    return Q(granularity=Granularity.DAY, period_start__range=(month_start, today)) | Q(
+        granularity=Granularity.MONTH, period_start=month_start
+    )
+
+
+def period_leaderboard_page(board, period, page, *, today=None):
+    today = today or timezone.localdate()
+    page_size = settings.RANKING_PAGE_SIZE
+    offset = (page - 1) * page_size
+    rows = UserPeriodStats.objects.filter(_period_buckets(period, today)).values("user_id")
+    if board == Board.PHASE1:
+        rows = (
+            rows.annotate(total=Sum("phase1_answered"), correct=Sum("phase1_correct"))
+            .filter(total__gte=_min_total(board))
+            .annotate(
+                rate=ExpressionWrapper(F("correct") * 100.0 / F("total"), output_field=FloatField())
+            )
+            .order_by("-rate", "-total", "-correct", "user_id")
+        )
+    else:
+        rows = (
+            rows.annotate(total=Sum("phase2_answered"), points=Sum("phase2_points"))
+            .filter(total__gte=_min_total(board))
+            .order_by("-points", "-total", "user_id")
+        )
+    rows = list(rows[offset : offset + page_size + 1])
+    users = get_user_model().objects.in_bulk([row["user_id"] for row in rows[:page_size]])
+    entries = []
+    for rank, row in enumerate(rows[:page_size], start=offset + 1):
+        points = row.get("points", 0)
+        rate = row.get("rate")
+        if rate is None:
+            rate = points / (row["total"] * 3) * 100 if row["total"] else 0
+        entries.append(
+            LeaderboardEntry(
+                board=board,
+                rank=rank,
+                user=users[row["user_id"]],
+                total=row["total"],
+                correct=row.get("correct", 0),
+                points=points,
+                rate=rate,
+            )
+        )
+    return {
+        "entries": entries,
+        "page": page,
+        "has_previous": page > 1,
+        "has_next": len(rows) > page_size,
+    }
+
+
+def rank_window(board, user, neighbours=None):
+    neighbours = settings.RANKING_NEIGHBOUR_COUNT if neighbours is None else neighbours
+    # Both lookups are index seeks: (board, user) finds the rank, (board, rank) the window.
+    rank = (
+        LeaderboardEntry.objects.filter(board=board, user=user)
+        .values_list("rank", flat=True)
+        .first()
+    )
+    if rank is None:
+        return None
+    entries = list(
+        LeaderboardEntry.objects.filter(
+            board=board,
+            rank__gte=rank - neighbours,
+            rank__lte=rank + neighbours,
+        )
+        .select_related("user")
+        .order_by("rank")
+    )
+    return {"rank": rank, "entries": entries}
+
+
+def rank_windows_for_user(user):
+    if not user.is_authenticated:
+        return {}
+    return {board: rank_window(board, user) for board in Board.values}
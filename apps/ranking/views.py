@@ -1,62 +1,43 @@
-from django.conf import settings
-from django.contrib.auth import get_user_model
-from django.db.models import Count, Q, Sum
 from django.shortcuts import render
 
-from apps.quiz.models import SessionQuestion
+from apps.ranking.models import LeaderboardEntry
+from apps.ranking.services.leaderboard import (
+    PERIODS,
+    leaderboard_page,
+    period_leaderboard_page,
+    rank_windows_for_user,
+)
 
 
-User = get_user_model()
+def _page_param(request, name):
+    value = request.GET.get(name, "1")
+    return max(int(value), 1) if value.isdigit() else 1
 
 
 def ranking_view(request):
-    phase1_rows = (
-        SessionQuestion.objects.values("session__user")
-        .annotate(
-            total=Count("id", filter=Q(phase1_is_correct__isnull=False)),
-            correct=Count("id", filter=Q(phase1_is_correct=True)),
-        )
-        .filter(total__gte=settings.RANKING_MIN_PHASE1)
-        .order_by("-total", "-correct")
-    )
-
-    phase2_rows = (
-        SessionQuestion.objects.filter(session__choice_count=4)
-        .values("session__user")
-        .annotate(
-            total=Count("id", filter=Q(phase2_score__isnull=False)),
-            points=Sum("phase2_score"),
-        )
-        .filter(total__gte=settings.RANKING_MIN_PHASE2)
-        .order_by("-points", "-total")
-    )
-
-    users = {user.id: user for user in User.objects.filter(id__in=[row["session__user"] for row in phase1_rows] + [row["session__user"] for row in phase2_rows])}
-
-    phase1_ranking = []
-    for row in phase1_rows:
-        user = users.get(row["session__user"])
-        if not user:
-            continue
-        rate = row["correct"] / row["total"] * 100 if row["total"] else 0
-        phase1_ranking.append({"user": user, "rate": rate, **row})
-    phase1_ranking.sort(
-        key=lambda row: (-row["rate"], -row["total"], -row["correct"], row["user"].id)
-    )
-
-    phase2_ranking = []
-    for row in phase2_rows:
-        user = users.get(row["session__user"])
-        if not user:
-            continue
-        points = row["points"] or 0
-        rate = points / (row["total"] * 3) * 100 if row["total"] else 0
-        phase2_ranking.append({"user": user, "rate": rate, "points": points, **row})
+    period = request.GET.get("period", "all")
+    if period not in PERIODS:
+        period = "all"
+    boards = {}
+    for board in LeaderboardEntry.Board.values:
+        page = _page_param(request, f"{board}_page")
+        if period == "all":
+            boards[board] = leaderboard_page(board, page)
+        else:
+            boards[board] = period_leaderboard_page(board, period, page)
 
     return render(
         request,
         "ranking/index.html",
-        {"phase1_ranking": phase1_ranking, "phase2_ranking": phase2_ranking},
+        {
+            "phase1_ranking": boards[LeaderboardEntry.Board.PHASE1]["entries"],
+            "phase2_ranking": boards[LeaderboardEntry.Board.PHASE2]["entries"],
+            "phase1_page": boards[LeaderboardEntry.Board.PHASE1],
+            "phase2_page": boards[LeaderboardEntry.Board.PHASE2],
+            "rank_windows": rank_windows_for_user(request.user) if period == "all" else {},
+            "period": period,
+            "periods": PERIODS,
+        },
     )
 
 # Create your views here.
@@ -0,0 +1,90 @@
+import random
+
+BATCH_SIZE = 5000
+
+
+def get_admin_user():
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    admin = User.objects.filter(login_id="bench-admin").first()
+    if admin:
+        return admin
+    return User.objects.create_superuser(
+        login_id="bench-admin", email="bench-admin@example.com", password="BenchPass123!"
+    )
+
+
+def get_llm_models():
+    from apps.content.models import LlmModel
+
+    specs = [
+        ("openai", "GPT系", "gpt", "GPT", "openai/gpt"),
+        ("anthropic", "Claude系", "claude", "Claude", "anthropic/claude"),
+        ("google", "Gemini系", "gemini", "Gemini", "google/gemini"),
+    ]
+    models = []
+    for provider, group, slug, name, api_name in specs:
+        model, _ = LlmModel.objects.get_or_create(
+            display_group_slug=slug,
+            defaults={
+                "provider": provider,
+                "display_group": group,
+                "display_name": name,
+                "api_model_name": api_name,
+            },
+        )
+        models.append(model)
+    return models
+
+
+def seed_published_questions(count, *, difficulty="easy", choice_count=2):
+    from apps.content.models import Genre, Option, Question, Scenario
+
+    admin = get_admin_user()
+    llm_models = get_llm_models()
+    genre, _ = Genre.objects.get_or_create(slug="bench", defaults={"name": "bench"})
+    scenario = Scenario.objects.create(
+        user_message_text="bench", human_reply_text="bench", genre=genre, created_by_admin=admin
+    )
+    created_ids = []
+    remaining = count
+    while remaining > 0:
+        size = min(BATCH_SIZE, remaining)
+        questions = Question.objects.bulk_create(
+            [
+                Question(
+                    scenario=scenario,
+                    status=Question.Status.PUBLISHED,
+                    difficulty=difficulty,
+                    choice_count=choice_count,
+                    random_key=random.random(),
+                    created_by_admin=admin,
+                )
+                for _ in range(size)
+            ]
+        )
+        options = []
+        for question in questions:
+            options.append(
+                Option(
+                    question=question,
+                    author_type=Option.AuthorType.HUMAN,
+                    content_text="human",
+                    generation_status=Option.GenerationStatus.OK,
+                )
+            )
+            for llm_model in llm_models[: choice_count - 1]:
+                options.append(
+                    Option(
+                        question=question,
+                        author_type=Option.AuthorType.AI,
+                        llm_model=llm_model,
+                        content_text="ai",
+                        generation_status=Option.GenerationStatus.OK,
+                    )
+                )
+        Option.objects.bulk_create(options)
+        created_ids.extend(question.id for question in questions)
+        remaining -= size
+    return created_ids
@@ -0,0 +1,143 @@
+"""Hammer quiz starts with concurrent double submits, before and after the fix.
+
+Every user fires --clicks simultaneous quiz starts (double click / several tabs)
+while --users users do the same in parallel. Reports allocation throughput and
+how many users ended up with more than one ACTIVE session for each mode:
+
+- before: the pre-fix flow, which checks for an active session outside the
+  transaction that creates one, with no per-user lock and no unique index.
+- after: start_or_resume_session (per-user row lock plus
+  unique_active_session_per_user).
+
+    python -m benchmarks.bench_concurrent_allocation --users 50 --clicks 2 --mode both
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._bootstrap import percentile, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--clicks", type=int, default=2)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--num-questions", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--mode", choices=("before", "after", "both"), default="both")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.db.models import Count
+
+    from apps.quiz.models import EligibleQuestion, QuizSession
+    from apps.quiz.services import session_allocator
+    from apps.quiz.services.question_pool import rebuild_question_pool
+    from apps.quiz.services.question_sampler import sample_question_ids
+    from benchmarks._fixtures import seed_published_questions
+
+    User = get_user_model()
+    seed_published_questions(args.questions)
+    rebuild_question_pool()
+    (unique_active,) = [
+        constraint
+        for constraint in QuizSession._meta.constraints
+        if constraint.name == "unique_active_session_per_user"
+    ]
+
+    def start_unguarded(user):
+        if session_allocator._active_session(user) is not None:
+            return
+        candidates = EligibleQuestion.objects.filter(difficulty="easy", choice_count=2)
+        session_allocator._create_session_with_questions(
+            user=user,
+            difficulty="easy",
+            choice_count=2,
+            question_ids=sample_question_ids(
+                candidates, args.num_questions, id_field="question_id"
+            ),
+        )
+
+    def start_guarded(user):
+        session_allocator.start_or_resume_session(
+            user=user,
+            difficulty="easy",
+            choice_count=2,
+            num_questions_requested=args.num_questions,
+        )
+
+    def run(mode, start):
+        users = [
+            User.objects.create_user(
+                login_id=f"{mode}-{index}",
+                email=f"{mode}-{index}@example.com",
+                password="BenchPass123!",
+            )
+            for index in range(args.users)
+        ]
+        connection.close()
+        errors = Counter()
+        latencies = []
+        lock = threading.Lock()
+
+        def click(user, barrier):
+            barrier.wait()
+            started = time.perf_counter()
+            try:
+                start(user)
+            except Exception as exc:  # noqa: BLE001 - benchmark tallies every failure mode
+                with lock:
+                    errors[type(exc).__name__] += 1
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                connection.close()
+
+        def user_burst(user):
+            barrier = threading.Barrier(args.clicks)
+            with ThreadPoolExecutor(max_workers=args.clicks) as clicks:
+                for _ in range(args.clicks):
+                    clicks.submit(click, user, barrier)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, args.threads // args.clicks)) as pool:
+            list(pool.map(user_burst, users))
+        elapsed = time.perf_counter() - started
+
+        active_per_user = (
+            QuizSession.objects.filter(user__in=users, status=QuizSession.Status.ACTIVE)
+            .values("user")
+            .annotate(active=Count("id"))
+        )
+        duplicated = sum(1 for row in active_per_user if row["active"] > 1)
+        total_requests = args.users * args.clicks
+        print(f"[{mode}]")
+        print(f"requests={total_requests} elapsed={elapsed:.2f}s throughput={total_requests / elapsed:.1f}/s")
+        print(
+            f"latency_ms p50={percentile(latencies, 50):.1f} "
+            f"p95={percentile(latencies, 95):.1f} p99={percentile(latencies, 99):.1f}"
+        )
+        print(f"users_with_duplicate_active_sessions={duplicated}/{args.users} ({duplicated / args.users:.1%})")
+        print(f"errors={dict(errors)}")
+
+    if args.mode in ("before", "both"):
+        with connection.schema_editor() as editor:
+            editor.remove_constraint(QuizSession, unique_active)
+        run("before", start_unguarded)
+        # Close the duplicates so the index can come back for the "after" run.
+        QuizSession.objects.update(status=QuizSession.Status.ABANDONED)
+        with connection.schema_editor() as editor:
+            editor.add_constraint(QuizSession, unique_active)
+    if args.mode in ("after", "both"):
+        run("after", start_guarded)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Load-test generate_and_persist_options against the offline OpenRouter stub.
+
+Creates --questions draft 4-choice questions and generates their three AI options
+with --concurrency questions in flight, then reports throughput, per-question
+latency percentiles and a breakdown of option outcomes (ok / 429 / 503 /
+circuit_open / network ...). No real API calls are made.
+
+    python -m benchmarks.bench_generation_load --questions 60 --concurrency 8 \\
+        --latency-ms 300 --jitter-ms 150 --rate-429 0.05 --rate-5xx 0.02 --retry-after 1
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._bootstrap import percentile, setup_django
+from benchmarks.stub_openrouter import add_stub_arguments, stub_config_from_args, stub_server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--use-cache", action="store_true")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.db import close_old_connections, connection
+
+    from apps.admin_portal.services.question_wizard_service import generate_and_persist_options
+    from apps.content.models import Genre, Option, Question, Scenario
+    from apps.content.services.openrouter_client import close_clients
+    from benchmarks._fixtures import get_admin_user, get_llm_models
+
+    admin = get_admin_user()
+    model_ids = [model.id for model in get_llm_models()]
+    genre, _ = Genre.objects.get_or_create(slug="bench", defaults={"name": "bench"})
+    questions = []
+    for index in range(args.questions):
+        scenario = Scenario.objects.create(
+            user_message_text=f"負荷試験の質問 {index}",
+            human_reply_text="人間の回答",
+            genre=genre,
+            created_by_admin=admin,
+        )
+        questions.append(
+            Question.objects.create(
+                scenario=scenario,
+                status=Question.Status.DRAFT,
+                difficulty="easy",
+                choice_count=4,
+                created_by_admin=admin,
+            )
+        )
+    connection.close()
+
+    latencies = []
+    crashes = Counter()
+    lock = threading.Lock()
+
+    def drive(question):
+        close_old_connections()
+        started = time.perf_counter()
+        try:
+            generate_and_persist_options(question=question, selected_model_ids=model_ids)
+        except Exception as exc:  # noqa: BLE001 - reported in the breakdown
+            with lock:
+                crashes[type(exc).__name__] += 1
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+        connection.close()
+
+    with stub_server(stub_config_from_args(args)) as base_url:
+        settings.OPENROUTER_BASE_URL = base_url
+        settings.OPENROUTER_API_KEY = "offline-stub"
+        settings.OPENROUTER_MAX_RETRIES = args.max_retries
+        settings.OPENROUTER_STREAM = args.stream
+        settings.GENERATION_CACHE_ENABLED = args.use_cache
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(drive, questions))
+        elapsed = time.perf_counter() - started
+        close_clients()
+
+    outcomes = Counter()
+    for status, error_message in Option.objects.filter(
+        question__in=questions, author_type=Option.AuthorType.AI
+    ).values_list("generation_status", "error_message"):
+        if status == Option.GenerationStatus.OK:
+            outcomes["ok"] += 1
+        else:
+            outcomes[(error_message or status).split(":", 1)[0]] += 1
+
+    total_options = sum(outcomes.values())
+    print(
+        f"questions={args.questions} concurrency={args.concurrency} stream={args.stream} "
+        f"elapsed={elapsed:.2f}s"
+    )
+    print(
+        f"throughput: {args.questions / elapsed:.2f} questions/s, "
+        f"{total_options / elapsed:.2f} options/s"
+    )
+    print(
+        f"question latency: p50={percentile(latencies, 50):.0f}ms "
+        f"p95={percentile(latencies, 95):.0f}ms p99={percentile(latencies, 99):.0f}ms"
+    )
+    print("options: " + ", ".join(f"{key}={count}" for key, count in outcomes.most_common()))
+    if crashes:
+        print("crashes: " + ", ".join(f"{key}={count}" for key, count in crashes.most_common()))
+
+
+if __name__ == "__main__":
+    main()
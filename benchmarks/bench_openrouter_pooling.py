@@ -0,0 +1,72 @@
+"""Compare OpenRouter call latency with a fresh httpx.Client per call vs the pooled client.
+
+Runs generate() against a local stub server, so the numbers show connection
+setup overhead only (plain TCP; a real TLS handshake widens the gap).
+
+    python -m benchmarks.bench_openrouter_pooling --calls 500 --threads 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from benchmarks._bootstrap import percentile, setup_django
+from benchmarks.stub_openrouter import stub_server
+
+
+class _UnpooledClient:
+    def post(self, *args, **kwargs):
+        with httpx.Client() as client:
+            return client.post(*args, **kwargs)
+
+
+def _run(label, calls, threads, generate):
+    latencies = []
+
+    def call(_):
+        started = time.perf_counter()
+        generate(api_model_name="stub/model", user_prompt="hello")
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, range(calls)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:>9}: {calls / elapsed:8.1f} req/s  "
+        f"p50={percentile(latencies, 50):6.2f}ms  p95={percentile(latencies, 95):6.2f}ms  "
+        f"p99={percentile(latencies, 99):6.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django(fresh_db=False)
+
+    from django.conf import settings
+
+    from apps.content.services import openrouter_client
+
+    with stub_server(latency_ms=args.latency_ms) as base_url:
+        settings.OPENROUTER_BASE_URL = base_url
+        settings.OPENROUTER_API_KEY = "bench"
+        settings.OPENROUTER_MAX_RETRIES = 1
+
+        original_get_client = openrouter_client.get_client
+        openrouter_client.get_client = _UnpooledClient
+        try:
+            _run("unpooled", args.calls, args.threads, openrouter_client.generate)
+        finally:
+            openrouter_client.get_client = original_get_client
+        _run("pooled", args.calls, args.threads, openrouter_client.generate)
+        openrouter_client.close_clients()
+
+
+if __name__ == "__main__":
+    main()
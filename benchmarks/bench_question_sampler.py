@@ -0,0 +1,76 @@
+"""Compare ORDER BY RANDOM() over the annotated eligibility join against the
+random-key sampler over the eligible question pool.
+
+    python -m benchmarks.bench_question_sampler --sizes 10000,100000,1000000
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks._bootstrap import setup_django
+
+
+def _time_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--requested", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seen", type=int, default=200)
+    args = parser.parse_args()
+    sizes = sorted(int(value) for value in args.sizes.split(",") if value.strip())
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+
+    from apps.quiz.models import EligibleQuestion, UserSeenQuestion
+    from apps.quiz.services.question_pool import eligible_questions_queryset, rebuild_question_pool
+    from apps.quiz.services.question_sampler import sample_question_ids
+    from benchmarks._fixtures import seed_published_questions
+
+    User = get_user_model()
+    user = User.objects.create_user(
+        login_id="bench-user", email="bench-user@example.com", password="BenchPass123!"
+    )
+    seeded = 0
+    print(f"{'questions':>10} {'order_by_random_ms':>20} {'random_key_ms':>15} {'speedup':>8}")
+    for size in sizes:
+        question_ids = seed_published_questions(size - seeded)
+        if not seeded:
+            UserSeenQuestion.objects.bulk_create(
+                UserSeenQuestion(
+                    user=user, question_id=question_id, status=UserSeenQuestion.Status.SOLVED
+                )
+                for question_id in question_ids[: args.seen]
+            )
+        seeded = size
+        rebuild_question_pool()
+
+        seen_ids = UserSeenQuestion.objects.filter(user=user).values_list("question_id", flat=True)
+        legacy = eligible_questions_queryset("easy", 2).exclude(id__in=seen_ids)
+        pool = EligibleQuestion.objects.filter(difficulty="easy", choice_count=2).exclude(
+            question_id__in=seen_ids
+        )
+        legacy_ms = _time_ms(
+            lambda qs=legacy: list(qs.order_by("?").values_list("id", flat=True)[: args.requested]),
+            args.repeat,
+        )
+        sampler_ms = _time_ms(
+            lambda qs=pool: sample_question_ids(qs, args.requested, id_field="question_id"),
+            args.repeat,
+        )
+        speedup = legacy_ms / sampler_ms if sampler_ms else float("inf")
+        print(f"{size:>10} {legacy_ms:>20.2f} {sampler_ms:>15.2f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import os
+import tempfile
+from pathlib import Path
+
+from config.settings.test import *
+
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get(
+            "BENCH_DB_PATH", str(Path(tempfile.gettempdir()) / "turing_arena_bench.sqlite3")
+        ),
+        "OPTIONS": {"timeout": 30, "transaction_mode": "IMMEDIATE"},
+    }
+}
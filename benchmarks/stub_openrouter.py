@@ -0,0 +1,159 @@
+"""Offline stand-in for OpenRouter's /chat/completions.
+
+Latency, 429/5xx injection, Retry-After and SSE streaming are configurable so the
+generation path can be load-tested without spending credits:
+
+    python -m benchmarks.stub_openrouter --port 8089 --latency-ms 800 --jitter-ms 400 \\
+        --rate-429 0.05 --rate-5xx 0.02 --retry-after 1
+
+then point OPENROUTER_BASE_URL at http://127.0.0.1:8089/api/v1.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    distribution: str = "uniform"
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after: int = None
+    stream_chunks: int = 8
+    reply_text: str = "スタブの応答です。"
+
+    def sample_latency(self, rng):
+        if self.distribution == "lognormal" and self.latency_ms > 0:
+            # Median latency_ms with a long right tail, like real model latencies.
+            sigma = self.jitter_ms / self.latency_ms if self.jitter_ms else 0.5
+            return rng.lognormvariate(0, sigma) * self.latency_ms / 1000
+        return max(self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        config = self.server.config
+        rng = self.server.rng
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        roll = rng.random()
+        if roll < config.rate_429:
+            headers = {"Retry-After": str(config.retry_after)} if config.retry_after is not None else {}
+            return self._send_json(429, {"error": {"code": 429, "message": "rate limited"}}, headers)
+        if roll < config.rate_429 + config.rate_5xx:
+            return self._send_json(503, {"error": {"code": 503, "message": "unavailable"}})
+
+        latency = config.sample_latency(rng)
+        meta = {"id": f"stub-{rng.getrandbits(32):08x}", "model": payload.get("model"), "created": int(time.time())}
+        usage = {"prompt_tokens": 10, "completion_tokens": config.stream_chunks, "total_tokens": 10 + config.stream_chunks}
+        if not payload.get("stream"):
+            time.sleep(latency)
+            return self._send_json(
+                200,
+                {**meta, "choices": [{"message": {"role": "assistant", "content": config.reply_text}}], "usage": usage},
+            )
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._write_chunk(b": OPENROUTER PROCESSING\n\n")
+        step = max(len(config.reply_text) // config.stream_chunks, 1)
+        parts = [config.reply_text[index : index + step] for index in range(0, len(config.reply_text), step)]
+        for part in parts:
+            time.sleep(latency / len(parts))
+            chunk = {**meta, "choices": [{"delta": {"content": part}}]}
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+        self._write_chunk(f"data: {json.dumps({**meta, 'choices': [], 'usage': usage})}\n\n".encode())
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(config, *, host="127.0.0.1", port=0, seed=None):
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.config = config
+    server.rng = random.Random(seed)
+    return server
+
+
+@contextmanager
+def stub_server(config=None, **overrides):
+    server = make_server(config or StubConfig(**overrides))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--distribution", choices=["uniform", "lognormal"], default="uniform")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=None)
+    parser.add_argument("--stream-chunks", type=int, default=8)
+
+
+def stub_config_from_args(args):
+    return StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        distribution=args.distribution,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        retry_after=args.retry_after,
+        stream_chunks=args.stream_chunks,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--seed", type=int, default=None)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    server = make_server(stub_config_from_args(args), host=args.host, port=args.port, seed=args.seed)
+    print(f"OpenRouter stub listening on http://{args.host}:{args.port}/api/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
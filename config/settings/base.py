@@ -15,14 +15,43 @@ env = environ.Env(
     MYSQL_PASSWORD=(str, ""),
     MYSQL_HOST=(str, "127.0.0.1"),
     MYSQL_PORT=(int, 3306),
+    CACHE_URL=(str, "locmemcache://"),
     OPENROUTER_API_KEY=(str, ""),
     OPENROUTER_BASE_URL=(str, "https://openrouter.ai/api/v1"),
     OPENROUTER_TIMEOUT_SECONDS=(int, 30),
     OPENROUTER_MAX_RETRIES=(int, 3),
+    OPENROUTER_MAX_CONCURRENCY=(int, 3),
+    OPENROUTER_MAX_CONNECTIONS=(int, 20),
+    OPENROUTER_MAX_KEEPALIVE_CONNECTIONS=(int, 10),
+    OPENROUTER_KEEPALIVE_EXPIRY_SECONDS=(float, 30.0),
+    OPENROUTER_HTTP2=(bool, False),
+    OPENROUTER_STREAM=(bool, False),
+    OPENROUTER_STREAM_IDLE_TIMEOUT_SECONDS=(float, 10.0),
+    OPENROUTER_RATE_LIMIT_PER_MINUTE=(int, 0),
+    OPENROUTER_MODEL_RATE_LIMIT_PER_MINUTE=(int, 0),
+    OPENROUTER_FREE_MODEL_RATE_LIMIT_PER_MINUTE=(int, 20),
+    OPENROUTER_RATE_LIMIT_MAX_WAIT_SECONDS=(int, 60),
+    OPENROUTER_RATE_LIMIT_CACHE=(str, "default"),
+    OPENROUTER_LATENCY_EWMA_ALPHA=(float, 0.3),
+    OPENROUTER_LATENCY_WINDOW_SECONDS=(int, 300),
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD=(int, 3),
+    CIRCUIT_BREAKER_COOLDOWN_SECONDS=(int, 120),
+    GENERATION_ASYNC_JOBS=(bool, False),
+    GENERATION_JOB_MAX_ATTEMPTS=(int, 3),
+    GENERATION_JOB_VISIBILITY_SECONDS=(int, 600),
+    GENERATION_CACHE_ENABLED=(bool, True),
+    GENERATION_CACHE_TTL_SECONDS=(int, 86400),
     ALLOWED_NUM_QUESTIONS=(str, "1,3,5,10"),
     RESERVE_TTL_HOURS=(int, 24),
+    RESERVATION_CLEANUP_ON_START=(bool, False),
+    SESSION_IDLE_HOURS=(int, 24),
     RANKING_MIN_PHASE1=(int, 10),
     RANKING_MIN_PHASE2=(int, 5),
+    RANKING_PAGE_SIZE=(int, 50),
+    ADMIN_QUESTION_PAGE_SIZE=(int, 50),
+    DASHBOARD_METRICS_TTL_SECONDS=(int, 60),
+    RANKING_NEIGHBOUR_COUNT=(int, 3),
+    LEADERBOARD_REFRESH_SECONDS=(int, 60),
 )
 
 environ.Env.read_env(BASE_DIR / ".env")
@@ -37,13 +66,47 @@ ALLOWED_NUM_QUESTIONS = [
     if value.strip()
 ]
 RESERVE_TTL_HOURS = env("RESERVE_TTL_HOURS")
+RESERVATION_CLEANUP_ON_START = env("RESERVATION_CLEANUP_ON_START")
+SESSION_IDLE_HOURS = env("SESSION_IDLE_HOURS")
 RANKING_MIN_PHASE1 = env("RANKING_MIN_PHASE1")
 RANKING_MIN_PHASE2 = env("RANKING_MIN_PHASE2")
+RANKING_PAGE_SIZE = env("RANKING_PAGE_SIZE")
+ADMIN_QUESTION_PAGE_SIZE = env("ADMIN_QUESTION_PAGE_SIZE")
+DASHBOARD_METRICS_TTL_SECONDS = env("DASHBOARD_METRICS_TTL_SECONDS")
+RANKING_NEIGHBOUR_COUNT = env("RANKING_NEIGHBOUR_COUNT")
+LEADERBOARD_REFRESH_SECONDS = env("LEADERBOARD_REFRESH_SECONDS")
 
 OPENROUTER_API_KEY = env("OPENROUTER_API_KEY")
 OPENROUTER_BASE_URL = env("OPENROUTER_BASE_URL")
 OPENROUTER_TIMEOUT_SECONDS = env("OPENROUTER_TIMEOUT_SECONDS")
 OPENROUTER_MAX_RETRIES = env("OPENROUTER_MAX_RETRIES")
+OPENROUTER_MAX_CONCURRENCY = env("OPENROUTER_MAX_CONCURRENCY")
+OPENROUTER_MAX_CONNECTIONS = env("OPENROUTER_MAX_CONNECTIONS")
+OPENROUTER_MAX_KEEPALIVE_CONNECTIONS = env("OPENROUTER_MAX_KEEPALIVE_CONNECTIONS")
+OPENROUTER_KEEPALIVE_EXPIRY_SECONDS = env("OPENROUTER_KEEPALIVE_EXPIRY_SECONDS")
+# Requires the h2 package (pip install "httpx[http2]").
+OPENROUTER_HTTP2 = env("OPENROUTER_HTTP2")
+OPENROUTER_STREAM = env("OPENROUTER_STREAM")
+OPENROUTER_STREAM_IDLE_TIMEOUT_SECONDS = env("OPENROUTER_STREAM_IDLE_TIMEOUT_SECONDS")
+# 0 disables a limit. Free (":free") models default to OpenRouter's 20 req/min.
+OPENROUTER_RATE_LIMIT_PER_MINUTE = env("OPENROUTER_RATE_LIMIT_PER_MINUTE")
+OPENROUTER_MODEL_RATE_LIMIT_PER_MINUTE = env("OPENROUTER_MODEL_RATE_LIMIT_PER_MINUTE")
+OPENROUTER_FREE_MODEL_RATE_LIMIT_PER_MINUTE = env("OPENROUTER_FREE_MODEL_RATE_LIMIT_PER_MINUTE")
+OPENROUTER_RATE_LIMIT_MAX_WAIT_SECONDS = env("OPENROUTER_RATE_LIMIT_MAX_WAIT_SECONDS")
+OPENROUTER_RATE_LIMIT_CACHE = env("OPENROUTER_RATE_LIMIT_CACHE")
+# Fallback routes are ordered by an EWMA of recent latency, forgotten after the window.
+OPENROUTER_LATENCY_EWMA_ALPHA = env("OPENROUTER_LATENCY_EWMA_ALPHA")
+OPENROUTER_LATENCY_WINDOW_SECONDS = env("OPENROUTER_LATENCY_WINDOW_SECONDS")
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = env("CIRCUIT_BREAKER_FAILURE_THRESHOLD")
+CIRCUIT_BREAKER_COOLDOWN_SECONDS = env("CIRCUIT_BREAKER_COOLDOWN_SECONDS")
+# When enabled the wizard only enqueues GenerationJob rows; run_generation_worker does the calls.
+GENERATION_ASYNC_JOBS = env("GENERATION_ASYNC_JOBS")
+GENERATION_JOB_MAX_ATTEMPTS = env("GENERATION_JOB_MAX_ATTEMPTS")
+GENERATION_JOB_VISIBILITY_SECONDS = env("GENERATION_JOB_VISIBILITY_SECONDS")
+# Only seeded requests are cached; unseeded completions are nondeterministic.
+GENERATION_CACHE_ENABLED = env("GENERATION_CACHE_ENABLED")
+# 0 keeps cached generations until they are purged.
+GENERATION_CACHE_TTL_SECONDS = env("GENERATION_CACHE_TTL_SECONDS")
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -111,6 +174,8 @@ else:
         }
     }
 
+CACHES = {"default": env.cache("CACHE_URL")}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
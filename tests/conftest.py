@@ -0,0 +1,101 @@
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from apps.content.models import Genre, LlmModel, Option, Question, Scenario
+from apps.quiz.services.question_pool import sync_question_pool
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def admin_user(db):
+    return get_user_model().objects.create_superuser(
+        login_id="admin",
+        email="admin@example.com",
+        password="AdminPass123!",
+    )
+
+
+@pytest.fixture
+def make_user(db):
+    def make(login_id="user1", email=None):
+        return get_user_model().objects.create_user(
+            login_id=login_id,
+            email=email or f"{login_id}@example.com",
+            password="UserPass123!",
+        )
+
+    return make
+
+
+@pytest.fixture
+def llm_models(db):
+    return [
+        LlmModel.objects.create(
+            provider=provider,
+            display_group=display_group,
+            display_group_slug=slug,
+            display_name=display_name,
+            api_model_name=f"{provider}/{slug}",
+        )
+        for provider, display_group, slug, display_name in (
+            ("openai", "GPT系", "gpt", "GPT"),
+            ("anthropic", "Claude系", "claude", "Claude"),
+            ("google", "Gemini系", "gemini", "Gemini"),
+        )
+    ]
+
+
+@pytest.fixture
+def make_question(db, admin_user, llm_models):
+    def make(
+        *,
+        difficulty="easy",
+        choice_count=4,
+        models=None,
+        status=Question.Status.PUBLISHED,
+        with_options=True,
+    ):
+        genre = Genre.objects.create(slug=f"genre-{uuid4().hex[:10]}", name="雑談")
+        scenario = Scenario.objects.create(
+            user_message_text="こんにちは",
+            human_reply_text="やあ",
+            genre=genre,
+            created_by_admin=admin_user,
+        )
+        question = Question.objects.create(
+            scenario=scenario,
+            status=status,
+            difficulty=difficulty,
+            choice_count=choice_count,
+            created_by_admin=admin_user,
+        )
+        if not with_options:
+            return question
+        models = list(models or llm_models)[: choice_count - 1]
+        Option.objects.create(
+            question=question,
+            author_type=Option.AuthorType.HUMAN,
+            content_text="やあ",
+            generation_status=Option.GenerationStatus.OK,
+        )
+        for model in models:
+            Option.objects.create(
+                question=question,
+                author_type=Option.AuthorType.AI,
+                llm_model=model,
+                content_text=f"{model.display_group}の回答",
+                generation_status=Option.GenerationStatus.OK,
+            )
+        sync_question_pool([question.id])
+        return question
+
+    return make
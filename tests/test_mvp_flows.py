@@ -1,5 +1,6 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.db import IntegrityError, transaction
 from django.test import override_settings
 from django.utils import timezone
@@ -9,6 +10,7 @@ from apps.admin_portal.models import AuditLog
 from apps.content.models import Genre, LlmModel, Option, Question, Scenario
 from apps.content.services.openrouter_client import OpenRouterError, OpenRouterResult
 from apps.quiz.models import QuizSession, SessionQuestion, UserSeenQuestion
+from apps.quiz.services.question_pool import sync_question_pool
 
 
 User = get_user_model()
@@ -89,6 +91,7 @@ def _create_question(*, admin_user, difficulty="easy", choice_count=4, model_set
                 content_text=f"{model.display_group}の回答",
                 generation_status=Option.GenerationStatus.OK,
             )
+    sync_question_pool([question.id])
     return question
 
 
@@ -307,6 +310,8 @@ def test_ranking_respects_min_attempts(client):
         phase2_answered_at=timezone.now(),
     )
 
+    call_command("rebuild_user_stats")
+    call_command("refresh_leaderboard")
     response = client.get("/ranking")
     body = response.content.decode("utf-8")
     assert "strong" in body
@@ -410,6 +415,69 @@ def test_admin_question_list_page_renders(client):
     assert "問題一覧" in response.content.decode("utf-8")
 
 
+@pytest.mark.django_db
+@override_settings(ADMIN_QUESTION_PAGE_SIZE=1)
+def test_admin_question_list_pages_by_id_and_sums_phase2_points(
+    client, admin_user, make_user, make_question
+):
+    player = make_user()
+    older = make_question()
+    newer = make_question()
+    for score in (3, 1):
+        session = QuizSession.objects.create(
+            user=player,
+            difficulty="easy",
+            choice_count=4,
+            num_questions_requested=1,
+            status=QuizSession.Status.FINISHED,
+        )
+        SessionQuestion.objects.create(
+            session=session,
+            question=newer,
+            order_index=0,
+            phase1_is_correct=True,
+            phase2_score=score,
+        )
+    call_command("rebuild_question_stats")
+    client.force_login(admin_user)
+
+    response = client.get("/admin/questions")
+    assert [question.id for question in response.context["questions"]] == [newer.id]
+    assert response.context["stats_by_id"][newer.id].phase2_points == 4
+    assert response.context["stats_by_id"][newer.id].phase1_correct == 2
+    assert response.context["next_before"] == newer.id
+
+    response = client.get(f"/admin/questions?before={newer.id}")
+    assert [question.id for question in response.context["questions"]] == [older.id]
+    assert list(response.context["stats_by_id"]) == []
+    assert response.context["next_before"] is None
+
+
+@pytest.mark.django_db
+def test_admin_dashboard_metrics_are_cached_until_archive(
+    client, admin_user, make_question, django_capture_on_commit_callbacks
+):
+    question = make_question()
+    client.force_login(admin_user)
+
+    metrics = client.get("/admin/dashboard").context["metrics"]
+    assert metrics["published_count"] == 1
+    assert metrics["stock"] == [
+        {"difficulty": "easy", "choice_count": 4, "count": 1, "consumed_24h": 0}
+    ]
+
+    for _ in range(2):
+        make_question()
+    assert client.get("/admin/dashboard").context["metrics"]["published_count"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post("/admin/questions", data={"question_id": question.id, "action": "archive"})
+    metrics = client.get("/admin/dashboard").context["metrics"]
+    assert metrics["published_count"] == 2
+    assert metrics["stock"][0]["count"] == 2
+    assert metrics["error_option_count"] == 0
+
+
 @pytest.mark.django_db
 def test_question_choice_count_is_guarded_by_db_constraint():
     admin_user = _create_admin()
@@ -513,6 +581,8 @@ def test_phase1_ranking_sorts_by_accuracy_first(client):
             phase1_answered_at=timezone.now(),
         )
 
+    call_command("rebuild_user_stats")
+    call_command("refresh_leaderboard")
     response = client.get("/ranking")
     body = response.content.decode("utf-8")
     assert response.status_code == 200
@@ -0,0 +1,644 @@
+import asyncio
+import io
+import json
+import threading
+import time
+from datetime import timedelta
+
+import httpx
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.admin_portal.models import AuditLog, GenerationJob
+from apps.admin_portal.services.dashboard_metrics import DASHBOARD_METRICS_KEY, dashboard_metrics
+from apps.admin_portal.services.generation_jobs import claim_next_job, run_job
+from apps.admin_portal.services.question_wizard_service import (
+    bulk_publish_questions,
+    enqueue_generation_jobs,
+    generate_and_persist_options,
+    publish_question,
+    retry_option_generation,
+)
+from apps.content.models import (
+    GenerationCacheEntry,
+    Genre,
+    ModelCircuitState,
+    Option,
+    Question,
+)
+from apps.content.services import circuit_breaker, model_routing, openrouter_client, rate_limiter
+from apps.content.services.openrouter_client import OpenRouterError, OpenRouterResult
+from apps.quiz.models import EligibleQuestion
+
+
+
+@pytest.mark.django_db
+@override_settings(OPENROUTER_MAX_CONCURRENCY=3)
+def test_generation_runs_models_concurrently_and_saves_each_outcome(
+    monkeypatch, llm_models, make_question
+):
+    question = make_question(status=Question.Status.DRAFT, with_options=False)
+    models = llm_models
+    # Every call waits for the other two, so a sequential run would time out.
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_generate(**kwargs):
+        barrier.wait()
+        if kwargs["api_model_name"] == "anthropic/claude":
+            raise OpenRouterError("boom", status_code=503, retryable=True)
+        if kwargs["api_model_name"] == "google/gemini":
+            raise KeyError("choices")
+        return OpenRouterResult(
+            content_text=f"generated-{kwargs['api_model_name']}",
+            response_payload={"model": kwargs["api_model_name"]},
+            request_payload={"model": kwargs["api_model_name"]},
+        )
+
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", fake_generate)
+    generated = generate_and_persist_options(
+        question=question,
+        selected_model_ids=[str(model.id) for model in models],
+        system_prompt="prompt",
+    )
+
+    assert [option.llm_model_id for option in generated] == [model.id for model in models]
+    statuses = {
+        option.llm_model.api_model_name: option.generation_status
+        for option in question.options.filter(author_type=Option.AuthorType.AI)
+    }
+    assert statuses == {
+        "openai/gpt": Option.GenerationStatus.OK,
+        "anthropic/claude": Option.GenerationStatus.ERROR,
+        "google/gemini": Option.GenerationStatus.ERROR,
+    }
+    assert question.options.get(llm_model=models[0]).content_text == "generated-openai/gpt"
+    assert "KeyError" in question.options.get(llm_model=models[2]).error_message
+
+
+def test_openrouter_client_is_shared_across_threads_and_reset_after_fork():
+    openrouter_client.close_clients()
+    seen = []
+    threads = [
+        threading.Thread(target=lambda: seen.append(openrouter_client.get_client()))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in seen}) == 1
+    assert seen[0] is openrouter_client.get_client()
+
+    async def async_clients():
+        return openrouter_client.get_async_client(), openrouter_client.get_async_client()
+
+    first, second = asyncio.run(async_clients())
+    assert first is second
+    assert asyncio.run(async_clients())[0] is not first
+
+    async def use_and_close():
+        client = openrouter_client.get_async_client()
+        await openrouter_client.aclose_async_client()
+        return client
+
+    assert asyncio.run(use_and_close()).is_closed
+    loop = asyncio.new_event_loop()
+    idle_client = loop.run_until_complete(async_clients())[0]
+    openrouter_client.close_clients()
+    assert idle_client.is_closed
+    loop.close()
+
+    openrouter_client._reset_after_fork()
+    assert openrouter_client.get_client() is not seen[0]
+    seen[0].close()
+    openrouter_client.close_clients()
+
+
+def _sse(*events):
+    for event in events:
+        if isinstance(event, (int, float)):
+            time.sleep(event)
+            continue
+        yield (event if event.startswith(":") else f"data: {event}").encode("utf-8") + b"\n\n"
+
+
+def _use_transport(monkeypatch, handler):
+    monkeypatch.setattr(
+        openrouter_client, "_client", httpx.Client(transport=httpx.MockTransport(handler))
+    )
+
+
+@override_settings(
+    OPENROUTER_API_KEY="test",
+    OPENROUTER_MAX_RETRIES=1,
+    OPENROUTER_STREAM=True,
+    OPENROUTER_STREAM_IDLE_TIMEOUT_SECONDS=0.5,
+)
+def test_streaming_generation_accumulates_chunks_and_records_metrics(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        chunks = [
+            json.dumps({"id": "gen-1", "model": "m", "choices": [{"delta": {"content": part}}]})
+            for part in ("こん", "にち", "は")
+        ]
+        usage = json.dumps({"choices": [], "usage": {"completion_tokens": 3}})
+        return httpx.Response(
+            200, content=_sse(": OPENROUTER PROCESSING", *chunks, usage, "[DONE]")
+        )
+
+    _use_transport(monkeypatch, handler)
+    result = openrouter_client.generate(api_model_name="m", user_prompt="hi")
+
+    assert requests[0]["stream"] is True
+    assert result.content_text == "こんにちは"
+    payload = result.response_payload
+    assert payload["id"] == "gen-1" and payload["usage"] == {"completion_tokens": 3}
+    assert payload["stream"] is True
+    assert payload["ttft_ms"] >= 0 and payload["duration_ms"] >= payload["ttft_ms"]
+    assert "tokens_per_second" in payload
+
+
+@override_settings(
+    OPENROUTER_API_KEY="test",
+    OPENROUTER_MAX_RETRIES=1,
+    OPENROUTER_STREAM=True,
+    OPENROUTER_STREAM_IDLE_TIMEOUT_SECONDS=0.05,
+)
+def test_streaming_generation_fails_fast_when_chunks_stall(monkeypatch):
+    first = json.dumps({"choices": [{"delta": {"content": "a"}}]})
+
+    def handler(request):
+        return httpx.Response(200, content=_sse(first, 0.1, ": OPENROUTER PROCESSING", "[DONE]"))
+
+    _use_transport(monkeypatch, handler)
+    with pytest.raises(OpenRouterError, match="stalled") as exc_info:
+        openrouter_client.generate(api_model_name="m", user_prompt="hi")
+    assert exc_info.value.retryable
+
+
+@pytest.mark.django_db
+@override_settings(GENERATION_CACHE_ENABLED=True, GENERATION_CACHE_TTL_SECONDS=0)
+def test_generation_cache_reuses_identical_requests_unless_bypassed(
+    client, monkeypatch, llm_models, make_question, django_capture_on_commit_callbacks
+):
+    question = make_question(status=Question.Status.DRAFT, with_options=False)
+    gpt = llm_models[0]
+    calls = []
+
+    def fake_generate(**kwargs):
+        calls.append(kwargs["api_model_name"])
+        return OpenRouterResult(
+            content_text=f"generated-{len(calls)}",
+            response_payload={"model": kwargs["api_model_name"]},
+            request_payload={"model": kwargs["api_model_name"]},
+        )
+
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", fake_generate)
+    option = generate_and_persist_options(
+        question=question, selected_model_ids=[gpt.id], system_prompt="prompt", seed=7
+    )[0]
+    retried = retry_option_generation(option)
+    assert len(calls) == 1
+    assert retried.content_text == "generated-1"
+    assert retried.response_payload_json["cache_hit"] is True
+
+    retried = retry_option_generation(option, bypass_cache=True)
+    assert len(calls) == 2
+    assert retried.content_text == "generated-2"
+
+    dashboard_metrics()
+    with django_capture_on_commit_callbacks(execute=True):
+        retry_option_generation(option)
+    assert len(calls) == 2
+    assert cache.get(DASHBOARD_METRICS_KEY) is None
+    entry = GenerationCacheEntry.objects.get()
+    assert (entry.hit_count, entry.miss_count, entry.content_text) == (2, 1, "generated-2")
+
+    with override_settings(GENERATION_CACHE_TTL_SECONDS=60):
+        retry_option_generation(option, bypass_cache=True)
+    GenerationCacheEntry.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    retry_option_generation(option)
+    assert len(calls) == 4
+    assert GenerationCacheEntry.objects.get().miss_count == 2
+
+    unseeded = generate_and_persist_options(
+        question=question, selected_model_ids=[gpt.id], system_prompt="prompt"
+    )[0]
+    retry_option_generation(unseeded)
+    assert len(calls) == 6
+    assert GenerationCacheEntry.objects.count() == 1
+
+    client.force_login(question.created_by_admin)
+    body = client.get("/admin/dashboard").content.decode("utf-8")
+    assert "ヒット率: 50.0%" in body
+
+
+class _FakeClock:
+    def __init__(self, start=1_800_000_000.0):
+        self.now = start
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+def _use_fake_clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "_now", clock.time)
+    monkeypatch.setattr(rate_limiter, "_sleep", clock.sleep)
+    return clock
+
+
+@override_settings(
+    OPENROUTER_RATE_LIMIT_PER_MINUTE=3,
+    OPENROUTER_MODEL_RATE_LIMIT_PER_MINUTE=2,
+    OPENROUTER_RATE_LIMIT_MAX_WAIT_SECONDS=120,
+)
+def test_rate_limiter_spends_model_and_global_buckets(monkeypatch):
+    clock = _use_fake_clock(monkeypatch)
+    rate_limiter.acquire("a/model")
+    rate_limiter.acquire("a/model")
+    assert clock.sleeps == []
+
+    rate_limiter.acquire("a/model")
+    assert clock.sleeps == [60.0]
+    rate_limiter.acquire("b/model")
+    rate_limiter.acquire("b/model")
+    assert len(clock.sleeps) == 1
+    rate_limiter.acquire("c/model")
+    assert clock.sleeps == [60.0, 60.0]
+
+    rate_limiter.acquire("d/model")
+    rate_limiter.acquire("d/model")
+    with pytest.raises(rate_limiter.RateLimitTimeout):
+        rate_limiter.acquire("e/model", max_wait=0)
+    with override_settings(OPENROUTER_RATE_LIMIT_PER_MINUTE=10):
+        rate_limiter.acquire("e/model")
+        rate_limiter.acquire("e/model")
+    assert clock.sleeps == [60.0, 60.0]
+
+    rate_limiter.block("b/model", clock.now + 500)
+    with pytest.raises(rate_limiter.RateLimitTimeout):
+        rate_limiter.acquire("b/model")
+
+
+@override_settings(OPENROUTER_API_KEY="test", OPENROUTER_MAX_RETRIES=3, OPENROUTER_STREAM=False)
+def test_generate_waits_for_retry_after_instead_of_blind_backoff(monkeypatch):
+    clock = _use_fake_clock(monkeypatch)
+    monkeypatch.setattr(
+        openrouter_client, "_sleep_backoff", lambda attempt: pytest.fail("blind backoff used")
+    )
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "7"}, text="slow down"),
+        httpx.Response(
+            200,
+            headers={"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(int((clock.now + 30) * 1000))},
+            json={"id": "x", "choices": [{"message": {"content": "ok"}}]},
+        ),
+    ]
+    _use_transport(monkeypatch, lambda request: responses.pop(0))
+
+    result = openrouter_client.generate(api_model_name="m", user_prompt="hi")
+    assert result.content_text == "ok"
+    assert clock.sleeps == [7.0]
+
+    rate_limiter.acquire("other/model")
+    assert clock.sleeps == [7.0, 23.0]
+
+
+@override_settings(OPENROUTER_API_KEY="test", OPENROUTER_MAX_RETRIES=1, OPENROUTER_STREAM=False)
+def test_generate_falls_back_on_5xx_and_skips_a_recently_failed_primary(monkeypatch):
+    attempted = []
+
+    def handler(request):
+        model = json.loads(request.content)["model"]
+        attempted.append(model)
+        if model == "a/primary":
+            return httpx.Response(503, text="unavailable")
+        return httpx.Response(
+            200, json={"id": "x", "model": model, "choices": [{"message": {"content": "ok"}}]}
+        )
+
+    _use_transport(monkeypatch, handler)
+    result = openrouter_client.generate(
+        api_model_name="a/primary", user_prompt="hi", fallback_model_names=["a/backup"]
+    )
+    assert attempted == ["a/primary", "a/backup"]
+    assert result.response_payload["served_model"] == "a/backup"
+    assert result.request_payload["model"] == "a/primary"
+    assert result.request_payload["fallback_model_names"] == ["a/backup"]
+
+    assert model_routing.route("a/primary", ["a/backup"]) == ["a/backup", "a/primary"]
+    attempted.clear()
+    openrouter_client.generate(
+        api_model_name="a/primary", user_prompt="hi", fallback_model_names=["a/backup"]
+    )
+    assert attempted == ["a/backup"]
+
+    # A success clears the failure marker: the primary leads again even though its EWMA is slower.
+    model_routing.observe_latency("a/primary", 500)
+    assert model_routing.route("a/primary", ["a/backup"]) == ["a/primary", "a/backup"]
+
+
+def test_route_keeps_a_healthy_primary_first_and_orders_only_the_fallbacks():
+    model_routing.observe_latency("x/gpt-4o", 900)
+    model_routing.observe_latency("x/mini", 300)
+    model_routing.observe_latency("x/haiku", 50)
+    assert model_routing.route("x/gpt-4o", ["x/unmeasured", "x/mini", "x/haiku"]) == [
+        "x/gpt-4o",
+        "x/haiku",
+        "x/mini",
+        "x/unmeasured",
+    ]
+
+    model_routing.observe_failure("x/gpt-4o")
+    assert model_routing.route("x/gpt-4o", ["x/mini", "x/haiku"]) == ["x/haiku", "x/mini", "x/gpt-4o"]
+
+
+@pytest.mark.django_db
+@override_settings(GENERATION_CACHE_ENABLED=True)
+def test_fallbacks_stay_in_the_provider_and_own_their_circuit_and_cache(
+    monkeypatch, llm_models, make_question
+):
+    gpt = llm_models[0]
+    gpt.fallback_model_names = ["anthropic/claude-haiku"]
+    with pytest.raises(ValidationError):
+        gpt.full_clean()
+    gpt.fallback_model_names = ["openai/gpt-mini"]
+    gpt.full_clean()
+    gpt.save()
+
+    ModelCircuitState.objects.create(
+        scope=ModelCircuitState.Scope.MODEL, key="openai/gpt", consecutive_failures=2
+    )
+    question = make_question(status=Question.Status.DRAFT, with_options=False)
+    calls = []
+
+    def fake_generate(**kwargs):
+        calls.append(kwargs["api_model_name"])
+        return OpenRouterResult(
+            content_text="from mini",
+            response_payload={"served_model": "openai/gpt-mini"},
+            request_payload={"model": kwargs["api_model_name"]},
+        )
+
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", fake_generate)
+    option = generate_and_persist_options(
+        question=question, selected_model_ids=[gpt.id], system_prompt="prompt", seed=7
+    )[0]
+    assert ModelCircuitState.objects.get(key="openai/gpt").consecutive_failures == 2
+    assert GenerationCacheEntry.objects.get().api_model_name == "openai/gpt-mini"
+
+    retry_option_generation(option)
+    assert len(calls) == 2
+
+
+def _fake_result(**kwargs):
+    return OpenRouterResult(
+        content_text=f"generated-{kwargs['api_model_name']}",
+        response_payload={"model": kwargs["api_model_name"]},
+        request_payload={"model": kwargs["api_model_name"]},
+    )
+
+
+@pytest.mark.django_db
+@override_settings(GENERATION_ASYNC_JOBS=True)
+def test_wizard_enqueues_jobs_and_worker_publishes_when_ready(
+    client, monkeypatch, admin_user, llm_models
+):
+    client.force_login(admin_user)
+    genre = Genre.objects.create(slug="zatsudan", name="雑談")
+    models = llm_models
+    monkeypatch.setattr(
+        "apps.admin_portal.services.question_wizard_service.generate",
+        lambda **kwargs: pytest.fail("wizard request must not call OpenRouter"),
+    )
+    response = client.post(
+        "/admin/questions/create",
+        data={
+            "user_message_text": "質問",
+            "human_reply_text": "人間回答",
+            "genre_id": genre.id,
+            "tag_ids": "",
+            "choice_count": 4,
+            "selected_model_ids": [str(model.id) for model in models],
+            "difficulty": "easy",
+            "publish_now": "on",
+        },
+    )
+    assert response.status_code == 302
+    question = Question.objects.latest("id")
+    assert question.status == Question.Status.DRAFT
+    assert GenerationJob.objects.filter(status=GenerationJob.Status.QUEUED).count() == 3
+    assert question.options.filter(generation_status=Option.GenerationStatus.PENDING).count() == 3
+
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", _fake_result)
+    call_command("run_generation_worker", "--once", stdout=io.StringIO())
+
+    question.refresh_from_db()
+    assert question.status == Question.Status.PUBLISHED
+    assert set(GenerationJob.objects.values_list("status", flat=True)) == {GenerationJob.Status.DONE}
+    assert AuditLog.objects.filter(
+        event_type=AuditLog.EventType.QUESTION_PUBLISH, target_question=question, actor=admin_user
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_worker_keeps_running_after_a_job_raises(monkeypatch, llm_models, make_question):
+    question = make_question(status=Question.Status.DRAFT, with_options=False)
+    crashing, healthy = enqueue_generation_jobs(
+        question=question, selected_model_ids=[model.id for model in llm_models[:2]]
+    )
+
+    def flaky_run_job(job):
+        if job.id == crashing.id:
+            raise RuntimeError("bug")
+        return run_job(job)
+
+    monkeypatch.setattr(
+        "apps.admin_portal.management.commands.run_generation_worker.run_job", flaky_run_job
+    )
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", _fake_result)
+    stderr = io.StringIO()
+    call_command("run_generation_worker", "--once", stdout=io.StringIO(), stderr=stderr)
+
+    assert f"job={crashing.id}" in stderr.getvalue()
+    crashing.refresh_from_db()
+    healthy.refresh_from_db()
+    assert crashing.status == GenerationJob.Status.RUNNING
+    assert healthy.status == GenerationJob.Status.DONE
+
+
+@pytest.mark.django_db
+@override_settings(GENERATION_JOB_MAX_ATTEMPTS=2, GENERATION_JOB_VISIBILITY_SECONDS=60)
+def test_generation_jobs_are_claimed_once_retried_and_expire(
+    monkeypatch, llm_models, make_question
+):
+    question = make_question(status=Question.Status.DRAFT, with_options=False)
+    job = enqueue_generation_jobs(question=question, selected_model_ids=[llm_models[0].id])[0]
+
+    claimed = claim_next_job(worker_id="worker-a")
+    assert claimed.id == job.id and claimed.attempts == 1
+    assert claim_next_job(worker_id="worker-b") is None
+
+    def fake_error(**kwargs):
+        raise OpenRouterError("boom", status_code=503, retryable=True)
+
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", fake_error)
+    job = run_job(claimed)
+    assert job.status == GenerationJob.Status.QUEUED
+    assert job.available_at > timezone.now() and "503" in job.last_error
+    assert claim_next_job(worker_id="worker-b") is None
+
+    later = job.available_at + timedelta(seconds=1)
+    reclaimed = claim_next_job(worker_id="worker-b", now=later)
+    assert (reclaimed.locked_by, reclaimed.attempts) == ("worker-b", 2)
+
+    # worker-b dies mid-job: once the lease lapses the exhausted job fails instead of looping.
+    assert claim_next_job(worker_id="worker-c", now=later + timedelta(seconds=61)) is None
+    reclaimed.refresh_from_db()
+    assert reclaimed.status == GenerationJob.Status.FAILED
+    option = reclaimed.option
+    option.refresh_from_db()
+    assert option.generation_status == Option.GenerationStatus.ERROR
+
+
+@pytest.mark.django_db(transaction=True)
+def test_wizard_calls_models_outside_a_transaction_and_publishes_once(
+    client, monkeypatch, admin_user, llm_models
+):
+    client.force_login(admin_user)
+    genre = Genre.objects.create(slug="zatsudan", name="雑談")
+    gpt = llm_models[0]
+    request_connection = connections["default"]
+    in_transaction = []
+
+    def fake_generate(**kwargs):
+        in_transaction.append(request_connection.in_atomic_block)
+        return _fake_result(**kwargs)
+
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", fake_generate)
+    response = client.post(
+        "/admin/questions/create",
+        data={
+            "user_message_text": "質問",
+            "human_reply_text": "人間回答",
+            "genre_id": genre.id,
+            "tag_ids": "",
+            "choice_count": 2,
+            "selected_model_ids": [str(gpt.id)],
+            "difficulty": "easy",
+            "publish_now": "on",
+        },
+    )
+    assert response.status_code == 302
+    assert in_transaction == [False]
+    question = Question.objects.latest("id")
+    assert question.status == Question.Status.PUBLISHED
+
+    stale_copy = Question.objects.get(id=question.id)
+    stale_copy.status = Question.Status.DRAFT
+    assert publish_question(stale_copy, actor=admin_user)
+    client.post("/admin/questions", data={"question_id": question.id, "action": "publish"})
+    assert AuditLog.objects.filter(
+        event_type=AuditLog.EventType.QUESTION_PUBLISH, target_question=question
+    ).count() == 1
+
+
+@pytest.mark.django_db
+@override_settings(CIRCUIT_BREAKER_FAILURE_THRESHOLD=2, CIRCUIT_BREAKER_COOLDOWN_SECONDS=60)
+def test_circuit_breaker_opens_fails_fast_and_recovers_through_half_open(
+    client, monkeypatch, llm_models, make_question
+):
+    question = make_question(status=Question.Status.DRAFT, with_options=False)
+    gpt, claude, _ = llm_models
+    calls = []
+
+    def flaky(**kwargs):
+        calls.append(kwargs["api_model_name"])
+        raise OpenRouterError("down", status_code=503, retryable=True)
+
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", flaky)
+    option = generate_and_persist_options(question=question, selected_model_ids=[gpt.id])[0]
+    retry_option_generation(option)
+    assert len(calls) == 2
+
+    option = retry_option_generation(option)
+    assert len(calls) == 2
+    assert option.generation_status == Option.GenerationStatus.ERROR
+    assert option.error_message.startswith("circuit_open:")
+    circuits = {
+        (circuit.scope, circuit.key): circuit.state for circuit in ModelCircuitState.objects.all()
+    }
+    assert circuits == {
+        ("provider", "openai"): ModelCircuitState.State.OPEN,
+        ("model", "openai/gpt"): ModelCircuitState.State.OPEN,
+    }
+    claude_option = generate_and_persist_options(question=question, selected_model_ids=[claude.id])[0]
+    assert len(calls) == 3 and claude_option.generation_status == Option.GenerationStatus.ERROR
+
+    client.force_login(question.created_by_admin)
+    body = client.get("/admin/dashboard").content.decode("utf-8")
+    assert "openai/gpt" in body and "Open" in body
+
+    ModelCircuitState.objects.filter(key__startswith="openai").update(
+        retry_at=timezone.now() - timedelta(seconds=1)
+    )
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", _fake_result)
+    circuit_breaker.before_call(gpt)
+    assert set(ModelCircuitState.objects.filter(key__startswith="openai").values_list("state", flat=True)) == {
+        ModelCircuitState.State.HALF_OPEN
+    }
+    with pytest.raises(circuit_breaker.CircuitOpenError):
+        circuit_breaker.before_call(gpt)
+
+    ModelCircuitState.objects.filter(key__startswith="openai").update(
+        retry_at=timezone.now() - timedelta(seconds=1)
+    )
+    option = retry_option_generation(option)
+    assert option.generation_status == Option.GenerationStatus.OK
+    assert set(ModelCircuitState.objects.filter(key__startswith="openai").values_list("state", flat=True)) == {
+        ModelCircuitState.State.CLOSED
+    }
+
+
+@pytest.mark.django_db
+def test_bulk_actions_publish_retry_and_archive_a_batch(
+    client, monkeypatch, django_assert_max_num_queries, admin_user, make_question
+):
+    questions = [make_question(status=Question.Status.DRAFT) for _ in range(3)]
+    questions[-1].options.filter(llm_model__display_group_slug="gemini").update(
+        generation_status=Option.GenerationStatus.ERROR
+    )
+    question_ids = [question.id for question in questions]
+
+    with django_assert_max_num_queries(12):
+        published, rejected = bulk_publish_questions(question_ids, actor=admin_user)
+    assert published == question_ids[:2]
+    assert rejected == question_ids[2:]
+
+    monkeypatch.setattr("apps.admin_portal.services.question_wizard_service.generate", _fake_result)
+    client.force_login(admin_user)
+    client.post("/admin/questions", data={"action": "bulk_retry", "question_ids": question_ids})
+    assert not Option.objects.filter(generation_status=Option.GenerationStatus.ERROR).exists()
+
+    client.post("/admin/questions", data={"action": "bulk_publish", "question_ids": question_ids})
+    assert set(Question.objects.values_list("status", flat=True)) == {Question.Status.PUBLISHED}
+    assert AuditLog.objects.filter(event_type=AuditLog.EventType.QUESTION_PUBLISH).count() == 3
+    assert EligibleQuestion.objects.count() == 3
+
+    client.post("/admin/questions", data={"action": "bulk_archive", "question_ids": question_ids})
+    assert set(Question.objects.values_list("status", flat=True)) == {Question.Status.ARCHIVED}
+    assert AuditLog.objects.filter(event_type=AuditLog.EventType.QUESTION_ARCHIVE).count() == 3
+    assert not EligibleQuestion.objects.exists()
@@ -0,0 +1,202 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.content.models import Option
+from apps.quiz.models import QuestionStats, QuizSession, SessionQuestion, UserPeriodStats, UserStats
+from apps.quiz.services.answer_key import get_answer_key, invalidate_answer_key
+from apps.quiz.services.answer_service import submit_phase1, submit_phase2
+
+
+@pytest.mark.django_db
+def test_answer_key_is_cached_until_version_bump(
+    django_assert_num_queries, llm_models, make_question
+):
+    _, claude, gemini = llm_models
+    question = make_question()
+    human_option = question.options.get(author_type=Option.AuthorType.HUMAN)
+
+    answer_key = get_answer_key(question)
+    assert answer_key.human_option_id == human_option.id
+    assert sorted(answer_key.ai_groups.values()) == ["claude", "gemini", "gpt"]
+    with django_assert_num_queries(0):
+        assert get_answer_key(question) == answer_key
+
+    question.options.filter(llm_model=gemini).update(llm_model=claude)
+    assert get_answer_key(question) == answer_key
+    invalidate_answer_key(question.id)
+    question.refresh_from_db()
+    assert sorted(get_answer_key(question).ai_groups.values()) == ["claude", "claude", "gpt"]
+
+
+def _human_letter(session_question):
+    human_option_id = get_answer_key(session_question.question).human_option_id
+    return next(
+        letter
+        for letter, option_id in session_question.shuffle_map_json.items()
+        if option_id == human_option_id
+    )
+
+
+def _wrong_letter(session_question):
+    return next(
+        letter for letter in session_question.shuffle_map_json if letter != _human_letter(session_question)
+    )
+
+
+@pytest.mark.django_db
+def test_session_counters_track_answers_and_match_backfill(client, make_user, make_question):
+    user = make_user()
+    for _ in range(3):
+        make_question()
+    client.force_login(user)
+    client.post("/quiz/start", data={"difficulty": "easy", "choice_count": 4, "num_questions": 3})
+    session = QuizSession.objects.get(user=user, status=QuizSession.Status.ACTIVE)
+
+    session_questions = list(SessionQuestion.objects.filter(session=session).select_related("question"))
+    for session_question, correct in zip(session_questions, (True, True, False)):
+        letter = _human_letter(session_question) if correct else _wrong_letter(session_question)
+        submit_phase1(session_question=session_question, selected_letter=letter)
+    first = session_questions[0]
+    answer_key = get_answer_key(first.question)
+    submit_phase2(
+        session_question=first,
+        assignment_map={str(option_id): slug for option_id, slug in answer_key.ai_groups.items()},
+    )
+
+    session.refresh_from_db()
+    live = (
+        session.phase1_answered_count,
+        session.phase1_correct_count,
+        session.phase1_current_streak,
+        session.phase1_best_streak,
+        session.phase2_answered_count,
+        session.phase2_points,
+        session.phase2_perfect_count,
+    )
+    assert live == (3, 2, 0, 2, 1, 3, 1)
+
+    response = client.get(f"/quiz/session/{session.id}/q/2/phase1_result")
+    assert "2/3" in response.content.decode("utf-8")
+
+    QuizSession.objects.filter(id=session.id).update(phase1_answered_count=0, phase2_points=0)
+    call_command("backfill_session_counters", "--session-id", str(session.id))
+    session.refresh_from_db()
+    assert session.phase1_answered_count == 3
+    assert session.phase2_points == 3
+
+
+@pytest.mark.django_db
+def test_double_submit_counts_the_first_answer_once(client, make_user, make_question):
+    user = make_user()
+    make_question()
+    client.force_login(user)
+    client.post("/quiz/start", data={"difficulty": "easy", "choice_count": 4, "num_questions": 1})
+    session = QuizSession.objects.get(user=user, status=QuizSession.Status.ACTIVE)
+    # Two requests that both loaded the row before either answered.
+    first, second = (
+        SessionQuestion.objects.select_related("question").get(session=session) for _ in range(2)
+    )
+
+    submit_phase1(session_question=first, selected_letter=_human_letter(first))
+    replay = submit_phase1(session_question=second, selected_letter=_wrong_letter(second))
+    assert replay["is_correct"] is True
+    answer_key = get_answer_key(first.question)
+    correct = {str(option_id): slug for option_id, slug in answer_key.ai_groups.items()}
+    swapped = dict(zip(correct, [*list(correct.values())[1:], list(correct.values())[0]]))
+    submit_phase2(session_question=first, assignment_map=correct)
+    assert submit_phase2(session_question=second, assignment_map=swapped)["score"] == 3
+
+    session.refresh_from_db()
+    stored = SessionQuestion.objects.get(session=session)
+    assert (stored.phase1_is_correct, stored.phase2_score) == (True, 3)
+    stats = UserStats.objects.get(user=user)
+    question_stats = QuestionStats.objects.get(question=first.question)
+    assert (session.phase1_answered_count, session.phase2_answered_count) == (1, 1)
+    assert (stats.phase1_answered, stats.phase2_answered, stats.phase2_points) == (1, 1, 3)
+    bucket = UserPeriodStats.objects.get(user=user, period_start=timezone.localdate())
+    assert (bucket.phase1_answered, bucket.phase2_answered, bucket.phase2_points) == (1, 1, 3)
+    assert (question_stats.phase1_answered, question_stats.phase2_answered) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_user_stats_follow_answers_and_rebuild_matches(client, make_user, make_question):
+    user = make_user()
+    for _ in range(2):
+        make_question()
+    client.force_login(user)
+    client.post("/quiz/start", data={"difficulty": "easy", "choice_count": 4, "num_questions": 1})
+    session = QuizSession.objects.get(user=user, status=QuizSession.Status.ACTIVE)
+    session_question = SessionQuestion.objects.select_related("question").get(session=session)
+    submit_phase1(session_question=session_question, selected_letter=_human_letter(session_question))
+    answer_key = get_answer_key(session_question.question)
+    slugs = sorted(answer_key.ai_groups.values())
+    submit_phase2(
+        session_question=session_question,
+        assignment_map={
+            str(option_id): slugs[index - 1] for index, option_id in enumerate(answer_key.ai_option_ids)
+        },
+    )
+
+    stats = UserStats.objects.get(user=user)
+    live = (stats.phase1_answered, stats.phase1_correct, stats.phase2_answered, stats.phase2_points)
+    assert live[:3] == (1, 1, 1)
+    response = client.get(f"/quiz/session/{session.id}/result")
+    assert f"フェーズ2: {live[3]} 点 / 1 問" in response.content.decode("utf-8")
+
+    bucket = UserPeriodStats.objects.get(user=user, period_start=timezone.localdate())
+    assert bucket.granularity == UserPeriodStats.Granularity.DAY
+    assert (bucket.phase1_answered, bucket.phase1_correct, bucket.phase2_answered, bucket.phase2_points) == live
+
+    UserStats.objects.all().delete()
+    UserPeriodStats.objects.all().delete()
+    call_command("rebuild_user_stats")
+    stats = UserStats.objects.get(user=user)
+    assert (stats.phase1_answered, stats.phase1_correct, stats.phase2_answered, stats.phase2_points) == live
+    bucket = UserPeriodStats.objects.get(user=user, period_start=timezone.localdate())
+    assert (bucket.phase1_answered, bucket.phase1_correct, bucket.phase2_answered, bucket.phase2_points) == live
+
+
+@pytest.mark.django_db
+def test_question_stats_follow_answers_and_rebuild_matches(client, make_user, make_question):
+    question = make_question()
+    answer_key = get_answer_key(question)
+    for index, (login_id, correct) in enumerate((("u1", True), ("u2", False))):
+        user = make_user(login_id)
+        client.force_login(user)
+        client.post("/quiz/start", data={"difficulty": "easy", "choice_count": 4, "num_questions": 1})
+        session_question = SessionQuestion.objects.select_related("question").get(
+            session__user=user
+        )
+        letter = _human_letter(session_question) if correct else _wrong_letter(session_question)
+        submit_phase1(
+            session_question=session_question,
+            selected_letter=letter,
+            phase1_time_ms=1000 if correct else None,
+        )
+        submit_phase2(
+            session_question=session_question,
+            assignment_map={str(option_id): slug for option_id, slug in answer_key.ai_groups.items()},
+            phase2_time_ms=2000 + index,
+        )
+
+    def snapshot():
+        stats = QuestionStats.objects.get(question=question)
+        return (
+            stats.phase1_answered,
+            stats.phase1_correct,
+            stats.phase1_timed,
+            stats.phase1_time_ms_total,
+            stats.phase2_answered,
+            stats.phase2_points,
+            stats.phase2_perfect,
+            stats.phase2_timed,
+            stats.phase2_time_ms_total,
+        )
+
+    live = snapshot()
+    assert live == (2, 1, 1, 1000, 2, 6, 2, 2, 4001)
+
+    QuestionStats.objects.all().delete()
+    call_command("rebuild_question_stats")
+    assert snapshot() == live
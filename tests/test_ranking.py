@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.quiz.models import UserPeriodStats, UserStats
+from apps.quiz.services.user_stats import compact_user_period_stats
+from apps.ranking.models import LeaderboardEntry
+from apps.ranking.services.leaderboard import (
+    leaderboard_page,
+    period_leaderboard_page,
+    rank_window,
+    refresh_leaderboard,
+)
+
+User = get_user_model()
+
+
+def _create_user_with_stats(login_id, **stats):
+    user = User.objects.create_user(
+        login_id=login_id, email=f"{login_id}@example.com", password="UserPass123!"
+    )
+    UserStats.objects.create(user=user, **stats)
+    return user
+
+
+@pytest.mark.django_db
+@override_settings(RANKING_MIN_PHASE1=2, RANKING_MIN_PHASE2=1, RANKING_PAGE_SIZE=2, LEADERBOARD_REFRESH_SECONDS=0)
+def test_leaderboard_snapshot_keeps_tie_break_order_and_pages(client):
+    half_small = _create_user_with_stats("half-small", phase1_answered=2, phase1_correct=1)
+    half_big = _create_user_with_stats("half-big", phase1_answered=4, phase1_correct=2)
+    perfect = _create_user_with_stats("perfect", phase1_answered=2, phase1_correct=2)
+    tied = _create_user_with_stats("tied", phase1_answered=4, phase1_correct=2)
+    _create_user_with_stats("too-few", phase1_answered=1, phase1_correct=1)
+
+    refresh_leaderboard(LeaderboardEntry.Board.PHASE1)
+    ranked = list(
+        LeaderboardEntry.objects.filter(board=LeaderboardEntry.Board.PHASE1).values_list(
+            "user_id", flat=True
+        )
+    )
+    assert ranked == [perfect.id, half_big.id, tied.id, half_small.id]
+
+    page = leaderboard_page(LeaderboardEntry.Board.PHASE1, 2)
+    assert [entry.user_id for entry in page["entries"]] == [tied.id, half_small.id]
+    assert page["has_previous"] and not page["has_next"]
+    response = client.get("/ranking?phase1_page=2")
+    body = response.content.decode("utf-8")
+    assert "half-small" in body and "perfect" not in body
+
+    UserStats.objects.filter(user=half_small).update(
+        phase1_answered=10, phase1_correct=10, updated_at=timezone.now()
+    )
+    client.get("/ranking")
+    assert LeaderboardEntry.objects.get(board="phase1", rank=1).user_id == perfect.id
+
+    call_command("refresh_leaderboard", "--if-stale")
+    assert LeaderboardEntry.objects.get(board="phase1", rank=1).user_id == half_small.id
+
+
+@pytest.mark.django_db
+@override_settings(RANKING_MIN_PHASE1=1, RANKING_MIN_PHASE2=1, LEADERBOARD_REFRESH_SECONDS=0)
+def test_rank_window_returns_neighbours_around_user(client):
+    users = [
+        _create_user_with_stats(f"player-{index}", phase1_answered=10, phase1_correct=10 - index)
+        for index in range(6)
+    ]
+    refresh_leaderboard(LeaderboardEntry.Board.PHASE1)
+
+    window = rank_window(LeaderboardEntry.Board.PHASE1, users[3], neighbours=1)
+    assert window["rank"] == 4
+    assert [entry.user_id for entry in window["entries"]] == [users[2].id, users[3].id, users[4].id]
+
+    edge = rank_window(LeaderboardEntry.Board.PHASE1, users[0], neighbours=2)
+    assert [entry.rank for entry in edge["entries"]] == [1, 2, 3]
+    assert rank_window(LeaderboardEntry.Board.PHASE2, users[0]) is None
+
+    client.login(login_id="player-3", password="UserPass123!")
+    body = client.get("/ranking").content.decode("utf-8")
+    assert "あなたの順位" in body and "フェーズ1: 4位" in body
+
+
+def _add_day_bucket(user, day, **stats):
+    UserPeriodStats.objects.create(
+        user=user, granularity=UserPeriodStats.Granularity.DAY, period_start=day, **stats
+    )
+
+
+@pytest.mark.django_db
+@override_settings(RANKING_MIN_PHASE1=1, RANKING_MIN_PHASE2=1)
+def test_period_boards_read_rollups_and_survive_compaction(client):
+    today = date(2026, 3, 12)
+    monday = today - timedelta(days=today.weekday())
+    early = User.objects.create_user(login_id="early", email="early@example.com", password="UserPass123!")
+    steady = User.objects.create_user(login_id="steady", email="steady@example.com", password="UserPass123!")
+    _add_day_bucket(early, date(2026, 3, 2), phase1_answered=4, phase1_correct=4)
+    _add_day_bucket(early, date(2026, 2, 20), phase2_answered=2, phase2_points=6)
+    _add_day_bucket(steady, monday, phase1_answered=2, phase1_correct=1)
+    _add_day_bucket(steady, today, phase1_answered=2, phase1_correct=2, phase2_answered=1, phase2_points=1)
+
+    def ranked(board, period):
+        page = period_leaderboard_page(board, period, 1, today=today)
+        return [(entry.user.login_id, entry.total) for entry in page["entries"]]
+
+    assert ranked("phase1", "day") == [("steady", 2)]
+    assert ranked("phase1", "week") == [("steady", 4)]
+    assert ranked("phase1", "month") == [("early", 4), ("steady", 4)]
+    assert ranked("phase2", "month") == [("steady", 1)]
+
+    merged, deleted = compact_user_period_stats(before=today)
+    assert (merged, deleted) == (1, 1)
+    month = UserPeriodStats.objects.get(user=early, granularity=UserPeriodStats.Granularity.MONTH)
+    assert (month.period_start, month.phase2_points) == (date(2026, 2, 1), 6)
+    assert ranked("phase1", "month") == [("early", 4), ("steady", 4)]
+
+    assert compact_user_period_stats(before=date(2026, 4, 1), today=today) == (0, 0)
+    assert UserPeriodStats.objects.filter(granularity=UserPeriodStats.Granularity.DAY).count() == 3
+    assert ranked("phase1", "week") == [("steady", 4)]
+    assert ranked("phase1", "month") == [("early", 4), ("steady", 4)]
+
+    with pytest.raises(CommandError):
+        call_command("compact_user_period_stats", "--before", "2999-01-01")
+    assert UserPeriodStats.objects.filter(granularity=UserPeriodStats.Granularity.DAY).count() == 3
+
+    response = client.get("/ranking?period=week")
+    assert response.status_code == 200
@@ -0,0 +1,181 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.content.models import Option
+from apps.quiz.models import (
+    EligibleQuestion,
+    QuizSession,
+    SessionQuestion,
+    UserSeenQuestion,
+)
+from apps.quiz.services import session_allocator
+from apps.quiz.services.question_sampler import sample_question_ids
+from apps.quiz.services.session_allocator import (
+    _create_session_with_questions,
+    start_or_resume_session,
+)
+
+
+@pytest.mark.django_db
+def test_sampler_returns_exact_count_and_skips_seen_questions(make_user, make_question):
+    user = make_user()
+    questions = [make_question(choice_count=2) for _ in range(12)]
+    seen = questions[:5]
+    for question in seen:
+        UserSeenQuestion.objects.create(
+            user=user, question=question, status=UserSeenQuestion.Status.SOLVED
+        )
+    seen_ids = UserSeenQuestion.objects.filter(user=user).values_list("question_id", flat=True)
+    candidates = EligibleQuestion.objects.filter(difficulty="easy", choice_count=2).exclude(
+        question_id__in=seen_ids
+    )
+
+    for requested in (1, 3, 5, 7):
+        for _ in range(20):
+            picked = sample_question_ids(candidates, requested, id_field="question_id")
+            assert len(picked) == requested
+            assert len(set(picked)) == requested
+            assert not set(picked) & {question.id for question in seen}
+
+
+@pytest.mark.django_db
+def test_question_pool_follows_archive_and_option_errors(client, admin_user, make_question):
+    archived, errored, kept = [make_question(choice_count=2) for _ in range(3)]
+    client.force_login(admin_user)
+    client.post("/admin/questions", data={"question_id": archived.id, "action": "archive"})
+    assert not EligibleQuestion.objects.filter(question=archived).exists()
+
+    errored.options.filter(author_type=Option.AuthorType.AI).update(
+        generation_status=Option.GenerationStatus.ERROR
+    )
+    with pytest.raises(CommandError):
+        call_command("rebuild_question_pool", "--check")
+    call_command("rebuild_question_pool")
+    call_command("rebuild_question_pool", "--check")
+    assert list(EligibleQuestion.objects.values_list("question_id", flat=True)) == [kept.id]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("num_questions", [1, 3, 5, 10])
+def test_session_allocation_runs_constant_queries(
+    django_assert_num_queries, num_questions, make_user, make_question
+):
+    user = make_user()
+    questions = [make_question(choice_count=2) for _ in range(10)]
+    question_ids = [question.id for question in questions[:num_questions]]
+    expired = UserSeenQuestion.objects.create(
+        user=user,
+        question_id=question_ids[0],
+        status=UserSeenQuestion.Status.RESERVED,
+        reserved_until=timezone.now() - timedelta(hours=1),
+    )
+
+    with django_assert_num_queries(6):
+        session = _create_session_with_questions(
+            user=user, difficulty="easy", choice_count=2, question_ids=question_ids
+        )
+
+    session_questions = list(SessionQuestion.objects.filter(session=session))
+    assert [item.question_id for item in session_questions] == question_ids
+    assert all(len(set(item.shuffle_map_json.values())) == 2 for item in session_questions)
+    seen = UserSeenQuestion.objects.filter(user=user)
+    assert seen.count() == num_questions
+    assert all(row.session_id == session.id and row.reserved_until > timezone.now() for row in seen)
+    assert seen.filter(id=expired.id).exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("num_questions", [1, 3, 5, 10])
+def test_session_start_runs_bounded_queries_end_to_end(
+    django_assert_max_num_queries, num_questions, make_user, make_question
+):
+    user = make_user()
+    for _ in range(10):
+        make_question(choice_count=2)
+
+    # The count is the same for 1 and 10 questions; only the sampler's wrap-around read is optional.
+    with django_assert_max_num_queries(13):
+        allocation = start_or_resume_session(
+            user=user, difficulty="easy", choice_count=2, num_questions_requested=num_questions
+        )
+
+    assert allocation["resumed"] is False
+    assert SessionQuestion.objects.filter(session=allocation["session"]).count() == num_questions
+
+
+@pytest.mark.django_db
+def test_reaper_drops_expired_reservations_and_abandons_idle_sessions(make_user, make_question):
+    idle_user = make_user()
+    active_user = make_user("user2")
+    questions = [make_question(choice_count=2) for _ in range(3)]
+    idle_session = _create_session_with_questions(
+        user=idle_user, difficulty="easy", choice_count=2, question_ids=[questions[0].id]
+    )
+    active_session = _create_session_with_questions(
+        user=active_user, difficulty="easy", choice_count=2, question_ids=[questions[1].id]
+    )
+    QuizSession.objects.filter(id=idle_session.id).update(
+        updated_at=timezone.now() - timedelta(hours=48)
+    )
+    SessionQuestion.objects.filter(session=idle_session).update(
+        updated_at=timezone.now() - timedelta(hours=48)
+    )
+    expired = UserSeenQuestion.objects.create(
+        user=active_user,
+        question=questions[2],
+        status=UserSeenQuestion.Status.RESERVED,
+        reserved_until=timezone.now() - timedelta(minutes=1),
+    )
+
+    call_command("reap_quiz_reservations", "--idle-hours", "24", "--batch-size", "1")
+
+    idle_session.refresh_from_db()
+    active_session.refresh_from_db()
+    assert idle_session.status == QuizSession.Status.ABANDONED
+    assert active_session.status == QuizSession.Status.ACTIVE
+    assert not UserSeenQuestion.objects.filter(session=idle_session).exists()
+    assert not UserSeenQuestion.objects.filter(id=expired.id).exists()
+    assert UserSeenQuestion.objects.filter(session=active_session).count() == 1
+
+
+@pytest.mark.django_db
+def test_second_active_session_is_rejected_and_racing_start_resumes_winner(
+    monkeypatch, make_user, make_question
+):
+    user = make_user()
+    questions = [make_question(choice_count=2) for _ in range(4)]
+    winner = _create_session_with_questions(
+        user=user, difficulty="easy", choice_count=2, question_ids=[questions[0].id]
+    )
+    with pytest.raises(IntegrityError), transaction.atomic():
+        QuizSession.objects.create(
+            user=user, difficulty="easy", choice_count=2, num_questions_requested=1
+        )
+    for _ in range(2):
+        QuizSession.objects.create(
+            user=user,
+            difficulty="easy",
+            choice_count=2,
+            num_questions_requested=1,
+            status=QuizSession.Status.ABANDONED,
+        )
+
+    real_active_session = session_allocator._active_session
+    stale_reads = iter([None])
+    monkeypatch.setattr(
+        session_allocator,
+        "_active_session",
+        lambda user: next(stale_reads, None) or real_active_session(user),
+    )
+    allocation = start_or_resume_session(
+        user=user, difficulty="easy", choice_count=2, num_questions_requested=1
+    )
+    assert allocation["resumed"] is True
+    assert allocation["session"] == winner
+    assert QuizSession.objects.filter(user=user, status=QuizSession.Status.ACTIVE).count() == 1
+    assert UserSeenQuestion.objects.filter(user=user).count() == 1